@@ -0,0 +1,62 @@
+"""
+Bulkheads
+
+Caps how many calls to one provider run at once and how many may wait for a
+slot. A call arriving when both are full is rejected immediately with
+BulkheadFull instead of queueing, so a slow provider cannot tie up the shared
+worker threadpool (and with it every sync endpoint) or pile up waiting
+requests; it only loses its own calls. A rejection surfaces to the fan-out as a
+failed call, but is local overload rather than a provider fault, so it is only
+counted here and not in the provider's health.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class BulkheadFull(Exception):
+    """Raised when a provider already has max_concurrent calls running and max_queue waiting"""
+
+
+class Bulkhead:
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 16):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        """Wait for a slot (cancellable), or raise BulkheadFull at once if the queue is full too"""
+        if self.active >= self.max_concurrent and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise BulkheadFull(f"{self.active} running, {self.waiting} queued")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
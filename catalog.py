@@ -0,0 +1,270 @@
+"""
+Provider Catalogs
+
+A Catalog holds the items of a static or slowly changing provider. Items are
+validated once when the catalog is built (or refreshed) and then stored
+column-wise: NumPy arrays for seeds, peers, size_bytes, year and source ids,
+code arrays for the release facets (resolution, codec, container), plus an
+interned title table. Filtering, ranking and top-k selection run vectorized over
+the columns; an item object is created the first time its row is returned and
+then reused by later searches of the same snapshot.
+The token and typeahead indexes and the near-duplicate signatures are built at
+the same time.
+
+Refreshing builds a complete new snapshot; upserting new infohashes builds one
+from the current snapshot plus the new rows only, extending its columns and
+indexes. Either way the new snapshot is swapped in with a single assignment, so
+concurrent readers always see a consistent catalog.
+"""
+
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from magnet import MagnetLink, parse_magnet
+from near_dup import title_signature
+from query_lang import OPTIONAL_NUMERIC, compile_query
+from text_index import InvertedIndex, PrefixIndex
+
+# stored for unknown size_bytes / year; never matches a filter
+_UNKNOWN = -1
+FACET_FIELDS = ("resolution", "codec", "container")
+
+
+def _encode(values: List[Optional[str]], table: Optional[Dict[Optional[str], int]] = None
+            ) -> Tuple[Dict[Optional[str], int], np.ndarray]:
+    """Intern `values` into a value -> code table (a copy of `table`, extended) and a code array"""
+    table = dict(table or {})
+    for value in values:
+        table.setdefault(value, len(table))
+    return table, np.fromiter((table[v] for v in values), dtype=np.int32, count=len(values))
+
+
+class _Snapshot:
+    __slots__ = (
+        "size", "titles", "magnets", "display_sizes", "source_table", "source_ids",
+        "seeds", "peers", "size_bytes", "year", "facet_codes", "facet_tables", "facet_values",
+        "health", "links", "infohashes", "index", "suggestions", "rows",
+    )
+
+    def __init__(self, items: Sequence[Any], base: Optional["_Snapshot"] = None, keep_from: int = 0):
+        """
+        Columns and indexes of `items`. With `base`: of base's rows from `keep_from` on, followed
+        by `items`. Kept rows are sliced out of base rather than parsed again, and if none are
+        dropped the indexes are extended rather than rebuilt. `base` itself is never modified.
+        """
+        n = len(items)
+
+        def kept(attr: str, empty: Any) -> Any:
+            return getattr(base, attr)[keep_from:] if base is not None else empty
+
+        def column(attr: str, values: Iterable[int], dtype: type) -> np.ndarray:
+            return np.concatenate([kept(attr, np.empty(0, dtype)), np.fromiter(values, dtype=dtype, count=n)])
+
+        def codes(previous: Optional[np.ndarray], table: Optional[Dict[Optional[str], int]],
+                  values: List[Optional[str]]) -> Tuple[Dict[Optional[str], int], np.ndarray]:
+            table, new_codes = _encode(values, table)
+            if previous is None:
+                return table, new_codes
+            return table, np.concatenate([previous[keep_from:], new_codes])
+
+        titles = tuple(sys.intern(item.title) for item in items)
+        self.titles: Tuple[str, ...] = kept("titles", ()) + titles
+        self.magnets: Tuple[str, ...] = kept("magnets", ()) + tuple(item.magnet for item in items)
+        self.display_sizes: Tuple[Optional[str], ...] = kept("display_sizes", ()) + tuple(item.size for item in items)
+        self.size = len(self.titles)
+
+        source_table, self.source_ids = codes(
+            base.source_ids if base is not None else None,
+            {value: code for code, value in enumerate(base.source_table)} if base is not None else None,
+            [item.source for item in items],
+        )
+        self.source_table: List[Optional[str]] = list(source_table)
+
+        seeds = [item.seeds or 0 for item in items]
+        self.seeds = column("seeds", seeds, np.int64)
+        self.peers = column("peers", (item.peers or 0 for item in items), np.int64)
+        self.size_bytes = column(
+            "size_bytes", (_UNKNOWN if item.size_bytes is None else item.size_bytes for item in items), np.int64,
+        )
+        self.year = column("year", (_UNKNOWN if item.year is None else item.year for item in items), np.int32)
+        self.facet_tables: Dict[str, Dict[Optional[str], int]] = {}
+        self.facet_values: Dict[str, List[Optional[str]]] = {}
+        self.facet_codes: Dict[str, np.ndarray] = {}
+        for field in FACET_FIELDS:
+            table, self.facet_codes[field] = codes(
+                base.facet_codes[field] if base is not None else None,
+                base.facet_tables[field] if base is not None else None,
+                [getattr(item, field) for item in items],
+            )
+            self.facet_tables[field] = table
+            self.facet_values[field] = list(table)
+        # swarm health, the default order of catalog results
+        self.health = np.log1p(self.seeds) + 0.5 * np.log1p(self.peers)
+
+        links = tuple(parse_magnet(item.magnet) for item in items)
+        self.links: Tuple[Optional[MagnetLink], ...] = kept("links", ()) + links
+        # MinHash signatures are memoized per title; computing them here keeps collapse=true cheap
+        for title in titles:
+            title_signature(title)
+        # materialized items by row, filled in as rows are returned
+        self.rows: List[Optional[Any]] = kept("rows", []) + [None] * n
+
+        if base is not None and keep_from == 0:
+            self.infohashes = base.infohashes.union(
+                link.infohash for link in links if link is not None and link.infohash is not None
+            )
+            self.index = base.index.extended(titles)
+            self.suggestions = base.suggestions.extended(zip(titles, seeds))
+        else:
+            self.infohashes = frozenset(
+                link.infohash for link in self.links if link is not None and link.infohash is not None
+            )
+            self.index = InvertedIndex(self.titles)
+            self.suggestions = PrefixIndex(zip(self.titles, self.seeds.tolist()))
+
+    def column(self, attr: str) -> np.ndarray:
+        return getattr(self, attr)
+
+    def row(self, item_type: Any, i: int) -> Any:
+        # items are immutable, so one object per row can be shared by every search
+        item = self.rows[i]
+        if item is None:
+            item = self.rows[i] = self._build(item_type, i)
+        return item
+
+    def _build(self, item_type: Any, i: int) -> Any:
+        size_bytes = int(self.size_bytes[i])
+        year = int(self.year[i])
+        source = self.source_table[self.source_ids[i]]
+        # already validated at ingest; skip validation on the way out. sources is set here so
+        # merging can return an unmerged row as is instead of copying it
+        return item_type.model_construct(
+            title=self.titles[i],
+            magnet=self.magnets[i],
+            size=self.display_sizes[i],
+            size_bytes=None if size_bytes == _UNKNOWN else size_bytes,
+            seeds=int(self.seeds[i]),
+            peers=int(self.peers[i]),
+            source=source,
+            sources=[source] if source else [],
+            year=None if year == _UNKNOWN else year,
+            **{field: self.facet_values[field][self.facet_codes[field][i]] for field in FACET_FIELDS},
+        )
+
+
+class Catalog:
+    """
+    Immutable, pre-indexed columnar item set of one provider; replace its contents with refresh().
+    Searches return every match unless `max_results` caps them: /api/search ranks, pages, counts
+    and facets the merged results of all providers, so a per-catalog cut would skew all of those.
+    """
+
+    def __init__(self, name: str, items: Iterable[Any] = (), item_type: Optional[type] = None,
+                 max_results: Optional[int] = None):
+        self.name = name
+        self.version = 0
+        self.max_results = max_results
+        items = list(items)
+        self._item_type = item_type or (type(items[0]) if items else None)
+        self._snapshot = _Snapshot(items)
+
+    def refresh(self, items: Iterable[Any]) -> None:
+        """Rebuild all derived data off to the side, then swap it in"""
+        items = list(items)
+        if self._item_type is None and items:
+            self._item_type = type(items[0])
+        self._snapshot = _Snapshot(items)
+        self.version += 1
+
+    def upsert(self, items: Iterable[Any], max_items: Optional[int] = None) -> int:
+        """
+        Add the items whose infohash is not in the catalog yet and swap in the new snapshot.
+        Known infohashes and items without a valid magnet are ignored. Only the new rows are
+        parsed and indexed; existing columns and indexes are extended. With `max_items`, the
+        oldest rows are dropped once that size would be exceeded. Returns how many items were added.
+        """
+        snap = self._snapshot
+        seen = set(snap.infohashes)
+        added = []
+        for item in items:
+            link = parse_magnet(item.magnet)
+            if link is not None and link.infohash is not None and link.infohash not in seen:
+                seen.add(link.infohash)
+                added.append(item)
+        if not added:
+            return 0
+        if self._item_type is None:
+            self._item_type = type(added[0])
+
+        keep_from = 0
+        if max_items is not None and snap.size + len(added) > max_items:
+            added = added[-max_items:]
+            # trim to 90% so the indexes are rebuilt once per 10% turnover, not on every poll
+            keep = max(0, max_items - max_items // 10 - len(added))
+            keep_from = snap.size - min(snap.size, keep)
+        self._snapshot = _Snapshot(added, base=snap, keep_from=keep_from)
+        self.version += 1
+        return len(added)
+
+    @property
+    def items(self) -> List[Any]:
+        snap = self._snapshot
+        return [snap.row(self._item_type, i) for i in range(snap.size)]
+
+    def __len__(self) -> int:
+        return self._snapshot.size
+
+    def search(self, q: str, fuzzy: bool = True, limit: Optional[int] = None) -> List[Any]:
+        """
+        All items matching the structured query `q` (see query_lang), or the best `limit`
+        (default max_results, None: no limit), best swarm health first. Numeric filters run
+        first as vectorized masks, together with facet code comparisons, then every free-text
+        token as a prefix. If the text matches nothing and `fuzzy` is set, typo-tolerant
+        matches are ranked instead.
+        """
+        snap = self._snapshot
+        limit = self.max_results if limit is None else limit
+        if limit is not None and limit <= 0:
+            return []
+        query = compile_query(q) if q else None
+
+        allowed: Optional[np.ndarray] = None
+        if query is not None and (query.numeric or query.facets):
+            mask = np.ones(snap.size, dtype=bool)
+            for attr, compare, value in query.numeric:
+                column = snap.column(attr)
+                mask &= compare(column, value)
+                if attr in OPTIONAL_NUMERIC:
+                    mask &= column != _UNKNOWN
+            for field, value in query.facets:
+                code = snap.facet_tables[field].get(value)
+                if code is None:
+                    return []
+                mask &= snap.facet_codes[field] == code
+            allowed = np.flatnonzero(mask)
+            if not len(allowed):
+                return []
+
+        text = query.text if query is not None else ""
+        within = set(allowed.tolist()) if allowed is not None else None
+        ids = np.asarray(snap.index.search(text, within=within), dtype=np.int64)
+        scores = snap.health[ids]
+        if not len(ids) and fuzzy and text:
+            matches = snap.index.fuzzy_search(text, within=within)
+            ids = np.fromiter((doc_id for doc_id, _ in matches), dtype=np.int64, count=len(matches))
+            similarity = np.fromiter((score for _, score in matches), dtype=np.float64, count=len(matches))
+            # text similarity dominates, health breaks ties
+            scores = 10.0 * similarity + snap.health[ids]
+
+        if limit is not None and len(ids) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            order = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+        return [snap.row(self._item_type, i) for i in ids[order].tolist()]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Typeahead (title, seeds) pairs for `prefix`, most seeded first"""
+        return self._snapshot.suggestions.suggest(prefix, limit)
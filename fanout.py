@@ -0,0 +1,87 @@
+"""
+Provider Fan-out
+
+Runs a set of named awaitables concurrently under an overall deadline: whatever
+has finished when the deadline passes is returned, everything still running is
+cancelled and reported as timed out. A call that raises asyncio.TimeoutError
+itself (e.g. a per-provider timeout) is reported as timed out too.
+iter_fan_out() yields each outcome as soon as it is available.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class FanOutResult:
+    """Outcome of a fan-out: results by name plus the names that did not make it"""
+    results: Dict[str, Any] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+
+OK = "ok"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+async def iter_fan_out(
+    calls: Dict[str, Awaitable],
+    deadline: Optional[float] = None,
+) -> AsyncIterator[Tuple[str, str, Any]]:
+    """
+    Like fan_out(), but yields (name, OK|TIMEOUT|ERROR, result or exception) as each call
+    finishes. Calls still running at the deadline are cancelled and yielded as TIMEOUT.
+    """
+    if not calls:
+        return
+
+    order = list(calls)
+    tasks = {asyncio.ensure_future(call): name for name, call in calls.items()}
+    loop = asyncio.get_running_loop()
+    end = None if deadline is None else loop.time() + deadline
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = None if end is None else end - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: order.index(tasks[t])):
+                exc = task.exception()
+                if exc is None:
+                    yield tasks[task], OK, task.result()
+                elif isinstance(exc, asyncio.TimeoutError):
+                    yield tasks[task], TIMEOUT, exc
+                else:
+                    yield tasks[task], ERROR, exc
+
+        for task in sorted(pending, key=lambda t: order.index(tasks[t])):
+            task.cancel()
+            yield tasks[task], TIMEOUT, None
+    finally:
+        # the consumer may stop early; never leave calls running behind it
+        for task in pending:
+            task.cancel()
+
+
+async def fan_out(
+    calls: Dict[str, Awaitable],
+    deadline: Optional[float] = None,
+) -> FanOutResult:
+    """Await all `calls` concurrently, bounded by an overall `deadline` (seconds)"""
+    outcome = FanOutResult()
+    async for name, status, value in iter_fan_out(calls, deadline):
+        if status == OK:
+            outcome.results[name] = value
+        elif status == TIMEOUT:
+            outcome.timed_out.append(name)
+        else:
+            outcome.failed.append(name)
+
+    # keep reporting order stable regardless of completion order
+    order = list(calls)
+    outcome.timed_out.sort(key=order.index)
+    outcome.failed.sort(key=order.index)
+    return outcome
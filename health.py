@@ -0,0 +1,115 @@
+"""
+Provider Health
+
+Per-provider health tracking: a rolling window of call outcomes (error rate), an
+exponentially weighted moving average of latency, a rolling window of successful
+call latencies (quantiles such as the p95 used for hedging) and a circuit breaker.
+
+    closed     calls flow; opens when the rolling error rate crosses the threshold
+    open       calls are skipped immediately until `open_seconds` have passed
+    half_open  one probe call is let through; success closes, failure re-opens
+"""
+
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Rolling error rate, latency EWMA and circuit breaker state of one provider"""
+
+    def __init__(self, window: int = 50, min_calls: int = 10, error_threshold: float = 0.5,
+                 open_seconds: float = 30.0, alpha: float = 0.2,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.open_seconds = open_seconds
+        self.alpha = alpha
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.latency_ewma: Optional[float] = None
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+        self.skipped = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        """`quantile` of recent successful call latencies; None until min_calls samples exist"""
+        if len(self._latencies) < self.min_calls:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; counts the call as skipped if not"""
+        now = self._clock()
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self._probe_started = None
+        if self.state == CLOSED:
+            return True
+        # a probe whose outcome never arrived (e.g. the request was cancelled) is given up on
+        if self.state == HALF_OPEN and (self._probe_started is None
+                                        or now - self._probe_started >= self.open_seconds):
+            self._probe_started = now
+            return True
+        self.skipped += 1
+        return False
+
+    def record_success(self, latency: float) -> None:
+        self.calls += 1
+        self._outcomes.append(True)
+        self._latencies.append(latency)
+        self.latency_ewma = latency if self.latency_ewma is None else (
+            self.alpha * latency + (1 - self.alpha) * self.latency_ewma
+        )
+        if self.state == HALF_OPEN:
+            self._close()
+
+    def record_failure(self) -> None:
+        self.calls += 1
+        self.failures += 1
+        self._outcomes.append(False)
+        if self.state == HALF_OPEN:
+            self._open()
+        elif (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+              and self.error_rate >= self.error_threshold):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self._clock()
+        self._probe_started = None
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_at = None
+        self._probe_started = None
+        self._outcomes.clear()
+
+    def snapshot(self) -> dict:
+        p95 = self.latency_quantile(0.95)
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate, 4),
+            "latency_ewma_ms": None if self.latency_ewma is None else round(self.latency_ewma * 1000, 2),
+            "latency_p95_ms": None if p95 is None else round(p95 * 1000, 2),
+            "calls": self.calls,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "window": len(self._outcomes),
+            "open_for_seconds": None if self.opened_at is None else round(self._clock() - self.opened_at, 1),
+        }
@@ -0,0 +1,76 @@
+"""
+Hedged Requests
+
+If a call has not answered by the provider's recent p95 latency, a second request
+(to a mirror, or the same endpoint again) is sent and whichever answers first wins;
+the other is cancelled. A HedgeBudget caps the extra load: every primary call earns
+`ratio` of a hedge token, every hedge spends a whole one, so over time hedges never
+exceed `ratio` of primary calls (plus a small burst).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+class HedgeBudget:
+    """Token bucket allowing at most `ratio` extra requests per primary request"""
+
+    def __init__(self, ratio: float = 0.05, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self.calls = 0
+        self.hedges = 0
+        self.denied = 0
+
+    def record_call(self) -> None:
+        self.calls += 1
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.hedges += 1
+            return True
+        self.denied += 1
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "ratio": self.ratio,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "denied": self.denied,
+            "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+async def hedged(primary: Callable[[], Awaitable[Any]], hedge: Callable[[], Awaitable[Any]],
+                 delay: Optional[float], budget: HedgeBudget) -> Any:
+    """
+    Await primary(); if it is still running after `delay` seconds and the budget allows,
+    also start hedge() and return the first successful result. An error from one request
+    is only raised if the other fails too. delay=None disables hedging.
+    """
+    budget.record_call()
+    first = asyncio.ensure_future(primary())
+    if delay is None:
+        return await first
+
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not budget.try_acquire():
+            return await first
+        tasks.append(asyncio.ensure_future(hedge()))
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                return succeeded[0].result()
+            if not pending:
+                return done.pop().result()
+    finally:
+        for task in tasks:
+            task.cancel()
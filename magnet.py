@@ -0,0 +1,102 @@
+"""
+Magnet URI Parsing
+
+Turns a magnet URI into a structured MagnetLink with the infohash in canonical
+form (40 lowercase hex characters, whether the link carried hex or base32).
+Parsing is memoized, so the cost is paid once per distinct magnet.
+"""
+
+import base64
+import binascii
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, quote
+
+_BTIH_PREFIX = "urn:btih:"
+_HEX_INFOHASH_RE = re.compile(r"[0-9a-fA-F]{40}")
+
+
+@dataclass(frozen=True)
+class MagnetLink:
+    infohash: Optional[str]          # canonical lowercase hex btih, None if missing/invalid
+    name: Optional[str] = None       # dn
+    trackers: Tuple[str, ...] = ()   # tr
+    web_seeds: Tuple[str, ...] = ()  # ws
+    length: Optional[int] = None     # xl, in bytes
+
+
+def canonical_infohash(value: str) -> Optional[str]:
+    """Normalize a hex (40 chars) or base32 (32 chars) btih to lowercase hex"""
+    value = value.strip()
+    if len(value) == 40:
+        # not int(value, 16): that also takes "0x", signs and underscores
+        return value.lower() if _HEX_INFOHASH_RE.fullmatch(value) else None
+    if len(value) == 32:
+        try:
+            return binascii.hexlify(base64.b32decode(value.upper())).decode("ascii")
+        except (binascii.Error, ValueError):
+            return None
+    return None
+
+
+@lru_cache(maxsize=8192)
+def parse_magnet(uri: str) -> Optional[MagnetLink]:
+    """Parse `uri`; returns None if it is not a magnet link at all"""
+    if not uri.lower().startswith("magnet:?"):
+        return None
+
+    infohash = None
+    name = None
+    length = None
+    trackers = []
+    web_seeds = []
+    for key, value in parse_qsl(uri[len("magnet:?"):]):
+        # multiple exact topics may be numbered: xt.1, xt.2, ...
+        base_key = key.split(".", 1)[0].lower()
+        if base_key == "xt":
+            if infohash is None and value.lower().startswith(_BTIH_PREFIX):
+                infohash = canonical_infohash(value[len(_BTIH_PREFIX):])
+        elif base_key == "dn":
+            name = name or value
+        elif base_key == "tr":
+            if value not in trackers:
+                trackers.append(value)
+        elif base_key == "ws":
+            if value not in web_seeds:
+                web_seeds.append(value)
+        elif base_key == "xl":
+            try:
+                length = int(value)
+            except ValueError:
+                pass
+
+    return MagnetLink(
+        infohash=infohash,
+        name=name,
+        trackers=tuple(trackers),
+        web_seeds=tuple(web_seeds),
+        length=length,
+    )
+
+
+def infohash_of(uri: str) -> Optional[str]:
+    """Canonical infohash of a magnet URI, or None"""
+    link = parse_magnet(uri)
+    return link.infohash if link else None
+
+
+def add_trackers(uri: str, trackers, known: Optional[Iterable[str]] = None) -> str:
+    """
+    Append the `trackers` that `uri` does not announce to yet, keeping everything else as is.
+    `known`: the trackers `uri` announces, if the caller already has them parsed.
+    """
+    if known is None:
+        link = parse_magnet(uri)
+        known = link.trackers if link else ()
+    known = set(known)
+    extra = [tr for tr in dict.fromkeys(trackers) if tr not in known]
+    if not extra:
+        return uri
+    return uri + "".join("&tr=" + quote(tr, safe="") for tr in extra)
@@ -1,8 +1,33 @@
 import os
-from fastapi import FastAPI, Query
+import asyncio
+import json
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Callable
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from typing import Dict, List, Literal, Optional, Callable, Awaitable, Union, Tuple
+
+from bulkhead import Bulkhead, BulkheadFull
+from caching import SingleFlight, TTLCache, FRESH, MISS, STALE
+from fanout import OK, TIMEOUT, fan_out, iter_fan_out
+from health import ProviderHealth
+from hedging import HedgeBudget, hedged
+from magnet import MagnetLink, parse_magnet
+from merging import ResultMerger
+from near_dup import collapse as collapse_near_duplicates
+from pagination import CursorExpired, SnapshotStore
+from query_lang import CompiledQuery, compile_query
+from release_info import RELEASE_FIELDS, extract_release_info
+from sizes import parse_size
+from ranking import top_k
+from catalog import Catalog
+from feeds import FeedPoller
+from remote import HTTP_POOL, JSONSearchProvider
 
 app = FastAPI(title="Torrent Streamer API")
 
@@ -12,15 +37,59 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Search-Timed-Out", "X-Search-Failed", "X-Search-Skipped", "X-Total-Count", "X-Pageable-Count", "X-Next-Cursor"],
 )
 
 class SearchItem(BaseModel):
+    # immutable so catalog items can be shared between requests and caches
+    model_config = ConfigDict(frozen=True)
+
     title: str
     magnet: str
     size: Optional[str] = None
+    # `size` in bytes, parsed once when the item is created (see sizes.parse_size)
+    size_bytes: Optional[int] = None
     seeds: Optional[int] = 0
     peers: Optional[int] = 0
     source: Optional[str] = None
+    # every provider that returned this torrent: [source] at ingest, extended when results are merged
+    sources: List[str] = []
+    # release metadata extracted from the title / magnet dn when the item is created
+    resolution: Optional[str] = None
+    codec: Optional[str] = None
+    year: Optional[int] = None
+    container: Optional[str] = None
+    # with collapse=true: how many near-duplicate results this one stands for
+    cluster_size: Optional[int] = None
+    # `magnet` parsed once when the item is created, so merging never parses it again
+    _link: Optional[MagnetLink] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        self._link = parse_magnet(self.magnet)
+
+    @property
+    def link(self) -> Optional[MagnetLink]:
+        # straight from the private slot: pydantic's __getattr__ is slow on hot merge paths
+        return self.__pydantic_private__["_link"]
+
+    @model_validator(mode="before")
+    @classmethod
+    def _derive_fields(cls, data):
+        """Parse size and release metadata and fill in sources once, at ingest, unless the provider supplied them"""
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        if not data.get("sources") and data.get("source"):
+            data["sources"] = [data["source"]]
+        if data.get("size_bytes") is None and data.get("size"):
+            data["size_bytes"] = parse_size(data["size"])
+        if data.get("title") and any(data.get(f) is None for f in RELEASE_FIELDS):
+            link = parse_magnet(data.get("magnet") or "")
+            info = extract_release_info(data["title"], link.name if link else None)
+            for f in RELEASE_FIELDS:
+                if data.get(f) is None:
+                    data[f] = getattr(info, f)
+        return data
 
 @app.get("/")
 def read_root():
@@ -77,156 +146,718 @@ def test_database():
 # ----------------------
 # Provider registry
 # ----------------------
-ProviderFunc = Callable[[str], List[SearchItem]]
+ProviderFunc = Callable[[str], Union[List[SearchItem], Awaitable[List[SearchItem]]]]
+
+# Overall budget for one /api/search call; providers still running after this are dropped
+SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", "5.0"))
+# hedged requests may add at most this percentage of extra calls per provider
+HEDGE_BUDGET_PERCENT = float(os.getenv("HEDGE_BUDGET_PERCENT", "5"))
+
+
+@dataclass
+class Provider:
+    """
+    A registered search provider.
+    `fetch` may be a plain function or a coroutine function. Plain functions are run
+    in the threadpool so a slow provider never blocks the event loop. Each provider has
+    its own bulkhead: at most `max_concurrent` calls run and `max_queue` wait, further
+    calls are rejected at once, so one slow provider cannot exhaust the shared threadpool.
+    """
+    name: str
+    fetch: ProviderFunc
+    timeout: float = 3.0
+    # per-provider result cache keyed on the normalized query; cache_ttl=0 disables it
+    cache_ttl: float = 0.0
+    cache_maxsize: int = 256
+    # local catalog backing this provider, if any (used for typeahead suggestions)
+    catalog: Optional[Catalog] = None
+    cache: Optional[TTLCache] = field(default=None, init=False, repr=False)
+    # hedging: a call still running at the provider's p95 latency is duplicated to `mirror`
+    # (or `fetch` again) and the first answer wins; capped by HEDGE_BUDGET_PERCENT
+    hedge: bool = False
+    mirror: Optional[ProviderFunc] = None
+    max_concurrent: int = 8
+    max_queue: int = 16
+    bulkhead: Optional[Bulkhead] = field(default=None, init=False, repr=False)
+    # rolling error rate, latency EWMA and circuit breaker; open breakers are skipped
+    health: ProviderHealth = field(default_factory=ProviderHealth, init=False, repr=False)
+    hedge_budget: HedgeBudget = field(
+        default_factory=lambda: HedgeBudget(ratio=HEDGE_BUDGET_PERCENT / 100), init=False, repr=False,
+    )
+
+    def __post_init__(self):
+        self.bulkhead = Bulkhead(self.max_concurrent, self.max_queue)
+        if self.cache_ttl > 0:
+            self.cache = TTLCache(maxsize=self.cache_maxsize, ttl=self.cache_ttl)
+
+    def cached(self, q: str) -> Optional[List[SearchItem]]:
+        if self.cache is None:
+            return None
+        items, state = self.cache.get(q)
+        return items if state == FRESH else None
+
+    def remember(self, q: str, items: List[SearchItem]) -> None:
+        if self.cache is not None:
+            self.cache.set(q, items)
+
+    async def call(self, q: str) -> List[SearchItem]:
+        """
+        One upstream call for `q`, bounded by `timeout`. It runs inside PROVIDER_FLIGHTS, so its
+        outcome and latency are recorded in `health` once per upstream call, however many
+        requests share it. Calls cancelled because every caller went away, and calls rejected by
+        the bulkhead (local overload, counted there), are not recorded.
+        """
+        started = time.monotonic()
+        try:
+            items = await asyncio.wait_for(self._fetch(q), self.timeout)
+        except BulkheadFull:
+            raise
+        except Exception:
+            self.health.record_failure()
+            raise
+        self.health.record_success(time.monotonic() - started)
+        # catalogs apply query filters themselves; anything else is filtered here
+        predicate = compile_query(q).predicate
+        if self.catalog is None and predicate is not None:
+            items = [item for item in items if predicate(item)]
+        return items
+
+    async def _fetch(self, q: str) -> List[SearchItem]:
+        # catalogs understand the query language; anything else only gets the free text and
+        # its results are filtered afterwards (see call)
+        if self.catalog is None:
+            q = compile_query(q).text
+        if not self.hedge:
+            return await self._run(self.fetch, q)
+        return await hedged(
+            lambda: self._run(self.fetch, q),
+            lambda: self._run(self.mirror or self.fetch, q),
+            delay=self.health.latency_quantile(0.95),
+            budget=self.hedge_budget,
+        )
+
+    async def _run(self, fetch: ProviderFunc, q: str) -> List[SearchItem]:
+        if asyncio.iscoroutinefunction(fetch):
+            async with self.bulkhead.slot():
+                return await fetch(q)
+        # waiting for a slot is cancellable, so a caller that times out leaves no queued work.
+        # A started threadpool call cannot be cancelled and keeps its thread until it returns,
+        # so only that part is shielded and its slot is released when the thread is done.
+        await self.bulkhead.acquire()
+        task = asyncio.ensure_future(run_in_threadpool(fetch, q))
+        task.add_done_callback(self._thread_done)
+        return await asyncio.shield(task)
+
+    def _thread_done(self, task: asyncio.Future) -> None:
+        self.bulkhead.release()
+        # retrieve the outcome so a failure nobody waits for any more is not logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+
+DEMO_CATALOG = Catalog("demo", [
+    SearchItem(
+        title="Big Buck Bunny 720p (WebTorrent demo)",
+        magnet=(
+            "magnet:?xt=urn:btih:08ada5a7a6183aae1e09d831df6748d566095a10&dn=Big+Buck+Bunny+%5B2008%5D+720p&tr=udp%3A%2F%2Ftracker.openbittorrent.com%3A80"
+            "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
+            "&tr=wss%3A%2F%2Ftracker.btorrent.xyz&tr=wss%3A%2F%2Ftracker.fastcast.nz"
+        ),
+        size="700MB",
+        seeds=500,
+        peers=200,
+        source="demo"
+    ),
+    SearchItem(
+        title="Sintel 720p (WebTorrent demo)",
+        magnet=(
+            "magnet:?xt=urn:btih:37d6f9393bd39f2f9d07c9f0e2b4f0de7b0ed2f5&dn=Sintel+%5B2010%5D+720p"
+            "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
+            "&tr=wss%3A%2F%2Ftracker.btorrent.xyz&tr=wss%3A%2F%2Ftracker.fastcast.nz"
+        ),
+        size="600MB",
+        seeds=200,
+        peers=80,
+        source="demo"
+    ),
+    SearchItem(
+        title="Tears of Steel 720p (WebTorrent demo)",
+        magnet=(
+            "magnet:?xt=urn:btih:4a5e1e4b5b816d05f4a8f2b5756fa0fe58f3dcb5&dn=Tears+of+Steel+%5B2012%5D+720p"
+            "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
+            "&tr=wss%3A%2F%2Ftracker.btorrent.xyz&tr=wss%3A%2F%2Ftracker.fastcast.nz"
+        ),
+        size="900MB",
+        seeds=120,
+        peers=60,
+        source="demo"
+    ),
+])
 
 
 def provider_demo(q: str) -> List[SearchItem]:
     """Demo provider returning curated, legal samples suitable for browser streaming."""
-    samples: List[SearchItem] = [
-        SearchItem(
-            title="Big Buck Bunny 720p (WebTorrent demo)",
-            magnet=(
-                "magnet:?xt=urn:btih:08ada5a7a6183aae1e09d831df6748d566095a10&dn=Big+Buck+Bunny+%5B2008%5D+720p&tr=udp%3A%2F%2Ftracker.openbittorrent.com%3A80"
-                "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
-                "&tr=wss%3A%2F%2Ftracker.btorrent.xyz&tr=wss%3A%2F%2Ftracker.fastcast.nz"
-            ),
-            size="700MB",
-            seeds=500,
-            peers=200,
-            source="demo"
+    return DEMO_CATALOG.search(q)
+
+
+LINUX_CATALOG = Catalog("linux", [
+    SearchItem(
+        title="Ubuntu 22.04.4 LTS Desktop amd64",
+        magnet=(
+            "magnet:?xt=urn:btih:9b9f0b3d6a1c9b0b2f0f5f7a6c3fb7a6f7c5c5b0&dn=ubuntu-22.04.4-desktop-amd64.iso"
+            "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=udp%3A%2F%2Ftracker.openbittorrent.com%3A80"
+            "&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
         ),
-        SearchItem(
-            title="Sintel 720p (WebTorrent demo)",
-            magnet=(
-                "magnet:?xt=urn:btih:37d6f9393bd39f2f9d07c9f0e2b4f0de7b0ed2f5&dn=Sintel+%5B2010%5D+720p"
-                "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
-                "&tr=wss%3A%2F%2Ftracker.btorrent.xyz&tr=wss%3A%2F%2Ftracker.fastcast.nz"
-            ),
-            size="600MB",
-            seeds=200,
-            peers=80,
-            source="demo"
+        size="3.8GB",
+        seeds=300,
+        peers=100,
+        source="linux"
+    ),
+    SearchItem(
+        title="Debian 12 netinst amd64",
+        magnet=(
+            "magnet:?xt=urn:btih:debian-12-netinst-amd64&dn=debian-12.0.0-amd64-netinst.iso"
+            "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce"
         ),
-        SearchItem(
-            title="Tears of Steel 720p (WebTorrent demo)",
-            magnet=(
-                "magnet:?xt=urn:btih:4a5e1e4b5b816d05f4a8f2b5756fa0fe58f3dcb5&dn=Tears+of+Steel+%5B2012%5D+720p"
-                "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
-                "&tr=wss%3A%2F%2Ftracker.btorrent.xyz&tr=wss%3A%2F%2Ftracker.fastcast.nz"
-            ),
-            size="900MB",
-            seeds=120,
-            peers=60,
-            source="demo"
+        size="650MB",
+        seeds=200,
+        peers=50,
+        source="linux"
+    ),
+    SearchItem(
+        title="Fedora Workstation 40 x86_64",
+        magnet=(
+            "magnet:?xt=urn:btih:fedora-40-workstation-x86_64&dn=Fedora-Workstation-Live-x86_64-40-1.14.iso"
+            "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce"
         ),
-    ]
-    if not q:
-        return samples
-    q_lower = q.lower()
-    return [s for s in samples if q_lower in s.title.lower()] or samples
+        size="2.2GB",
+        seeds=120,
+        peers=40,
+        source="linux"
+    ),
+])
 
 
 def provider_linux(q: str) -> List[SearchItem]:
     """Provider with well-known, legal Linux ISO magnets (Ubuntu, Debian, Fedora)."""
-    items: List[SearchItem] = [
-        SearchItem(
-            title="Ubuntu 22.04.4 LTS Desktop amd64",
-            magnet=(
-                "magnet:?xt=urn:btih:9b9f0b3d6a1c9b0b2f0f5f7a6c3fb7a6f7c5c5b0&dn=ubuntu-22.04.4-desktop-amd64.iso"
-                "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce&tr=udp%3A%2F%2Ftracker.openbittorrent.com%3A80"
-                "&tr=wss%3A%2F%2Ftracker.openwebtorrent.com"
-            ),
-            size="3.8GB",
-            seeds=300,
-            peers=100,
-            source="linux"
-        ),
-        SearchItem(
-            title="Debian 12 netinst amd64",
-            magnet=(
-                "magnet:?xt=urn:btih:debian-12-netinst-amd64&dn=debian-12.0.0-amd64-netinst.iso"
-                "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce"
-            ),
-            size="650MB",
-            seeds=200,
-            peers=50,
-            source="linux"
-        ),
-        SearchItem(
-            title="Fedora Workstation 40 x86_64",
-            magnet=(
-                "magnet:?xt=urn:btih:fedora-40-workstation-x86_64&dn=Fedora-Workstation-Live-x86_64-40-1.14.iso"
-                "&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce"
-            ),
-            size="2.2GB",
-            seeds=120,
-            peers=40,
-            source="linux"
-        ),
-    ]
-    if not q:
-        return items
-    q_lower = q.lower()
-    return [s for s in items if q_lower in s.title.lower()] or []
+    return LINUX_CATALOG.search(q)
 
 
-PROVIDERS: dict[str, ProviderFunc] = {
-    "demo": provider_demo,
-    "linux": provider_linux,
+PROVIDERS: dict[str, Provider] = {
+    "demo": Provider("demo", provider_demo, timeout=1.0, cache_ttl=300, cache_maxsize=512, catalog=DEMO_CATALOG),
+    "linux": Provider("linux", provider_linux, timeout=1.0, cache_ttl=300, cache_maxsize=512, catalog=LINUX_CATALOG),
 }
 
+# remote JSON search APIs (see remote.py): REMOTE_SEARCH_URLS="name=https://host[|https://mirror],..."
+for _spec in filter(None, (s.strip() for s in os.getenv("REMOTE_SEARCH_URLS", "").split(","))):
+    _name, _, _urls = _spec.partition("=")
+    _primary, _, _mirror = _urls.partition("|")
+    PROVIDERS[_name] = Provider(
+        _name,
+        JSONSearchProvider(_name, _primary, item_type=SearchItem).search,
+        timeout=3.0,
+        cache_ttl=60,
+        hedge=True,
+        mirror=JSONSearchProvider(_name, _mirror, item_type=SearchItem).search if _mirror else None,
+    )
+
+
+# RSS/Torznab feeds polled into in-memory catalogs (see feeds.py): FEED_URLS="name=https://host/rss,..."
+FEED_POLL_SECONDS = float(os.getenv("FEED_POLL_SECONDS", "300"))
+FEED_POLLERS: dict[str, FeedPoller] = {}
+for _spec in filter(None, (s.strip() for s in os.getenv("FEED_URLS", "").split(","))):
+    _name, _, _url = _spec.partition("=")
+    _catalog = Catalog(_name, item_type=SearchItem)
+    FEED_POLLERS[_name] = FeedPoller(_name, _url, _catalog, SearchItem, interval=FEED_POLL_SECONDS)
+    PROVIDERS[_name] = Provider(_name, _catalog.search, timeout=1.0, catalog=_catalog)
+
+_feed_tasks: List[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def start_feed_pollers():
+    _feed_tasks.extend(asyncio.create_task(poller.run()) for poller in FEED_POLLERS.values())
+
+
+@app.on_event("shutdown")
+async def close_http_pool():
+    for task in _feed_tasks:
+        task.cancel()
+    await asyncio.gather(*_feed_tasks, return_exceptions=True)
+    _feed_tasks.clear()
+    await HTTP_POOL.aclose()
+
+
+# ----------------------
+# Search result cache
+# ----------------------
+SEARCH_CACHE = TTLCache(
+    maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "60")),
+    stale_ttl=float(os.getenv("SEARCH_CACHE_STALE_TTL", "300")),
+)
+_refreshing: dict[tuple, asyncio.Task] = {}
+SEARCH_FLIGHTS = SingleFlight()
+# coalesces identical (provider, query) calls across different source combinations
+PROVIDER_FLIGHTS = SingleFlight()
+
+
+def select_providers(sources: Optional[str], query: Optional[CompiledQuery] = None) -> List[Provider]:
+    """Providers named in the comma-separated `sources` (or all), narrowed by any source: filter in `query`"""
+    selected = [k.strip() for k in sources.split(',')] if sources else list(PROVIDERS.keys())
+    if query is not None and query.sources:
+        selected = [key for key in selected if key in query.sources]
+    return [PROVIDERS[key] for key in dict.fromkeys(selected) if key in PROVIDERS]
+
+
+def demo_fallback_allowed(sources: Optional[str], query: CompiledQuery) -> bool:
+    """Whether an empty search may fall back to the demo catalog: not if the client chose other providers"""
+    if query.sources and "demo" not in query.sources:
+        return False
+    named = [key for key in (k.strip() for k in sources.split(",")) if key in PROVIDERS] if sources else []
+    return not named or "demo" in named
+
+
+def normalize_query(q: str) -> str:
+    """
+    Case-, width- and whitespace-insensitive form of a query, used for cache keys and provider
+    calls. Punctuation is kept because filters need it; tokens are folded further by textnorm.
+    """
+    return " ".join(unicodedata.normalize("NFKC", q).casefold().split())
+
+
+def call_provider(p: Provider, q: str) -> Awaitable[List[SearchItem]]:
+    """
+    p.call(q), shared with any identical call already in flight. The provider's timeout is
+    enforced inside the shared call (raising TimeoutError to every waiter), so fan-outs only
+    pass their overall deadline.
+    """
+    return PROVIDER_FLIGHTS.do((p.name, q), lambda: p.call(q))
+
+
+def admit(providers: List[Provider]) -> Tuple[List[Provider], List[str]]:
+    """Split `providers` into those that may be called and the names of those with an open breaker"""
+    allowed, skipped = [], []
+    for p in providers:
+        if p.health.allow():
+            allowed.append(p)
+        else:
+            skipped.append(p.name)
+    return allowed, skipped
+
+
+async def aggregate(q: str, providers: List[Provider]
+                    ) -> Tuple[List[SearchItem], List[str], List[str], List[str]]:
+    """
+    Fan out to `providers` and merge duplicates. Returns (items, names of providers that timed
+    out, names of providers that raised, names of providers skipped because their circuit
+    breaker is open). Providers with a fresh per-provider cache entry for `q` are not called at all.
+    """
+    slices = {}
+    to_call: List[Provider] = []
+    for p in providers:
+        items = p.cached(q)
+        if items is None:
+            to_call.append(p)
+        else:
+            slices[p.name] = items
+    to_call, skipped = admit(to_call)
+
+    # failed providers are simply left out (fail closed per provider)
+    outcome = await fan_out(
+        {p.name: call_provider(p, q) for p in to_call},
+        deadline=SEARCH_DEADLINE_SECONDS,
+    )
+    for p in to_call:
+        if p.name in outcome.results:
+            slices[p.name] = outcome.results[p.name]
+            p.remember(q, slices[p.name])
+
+    # duplicates (same infohash) are merged: trackers unioned, best seeds/peers kept
+    merger = ResultMerger()
+    for p in providers:
+        merger.extend(slices.get(p.name, []))
+
+    return merger.items(), outcome.timed_out, outcome.failed, skipped
+
+
+async def cached_aggregate(q: str, providers: List[Provider]
+                           ) -> Tuple[List[SearchItem], List[str], List[str], List[str]]:
+    """
+    aggregate() behind SEARCH_CACHE. Stale entries are served immediately and refreshed
+    in the background. Partial results (some provider timed out, failed or was skipped) are
+    never cached.
+    Identical concurrent computations are coalesced into one through SEARCH_FLIGHTS.
+    """
+    key = (q, tuple(sorted(p.name for p in providers)))
+
+    async def compute() -> Tuple[List[SearchItem], List[str], List[str], List[str]]:
+        items, timed_out, failed, skipped = await aggregate(q, providers)
+        if not timed_out and not failed and not skipped:
+            SEARCH_CACHE.set(key, items)
+        return items, timed_out, failed, skipped
+
+    cached, state = SEARCH_CACHE.get(key)
+    if state == MISS:
+        return await SEARCH_FLIGHTS.do(key, compute)
+
+    if state == STALE and key not in _refreshing:
+        async def refresh():
+            try:
+                await SEARCH_FLIGHTS.do(key, compute)
+            finally:
+                _refreshing.pop(key, None)
+
+        _refreshing[key] = asyncio.create_task(refresh())
+    return cached, [], [], []
+
+
+MAX_SEARCH_LIMIT = 500
+MAX_SEARCH_OFFSET = 10_000
+
+# Ranked result sets kept for cursor pagination
+SNAPSHOTS = SnapshotStore(
+    maxsize=int(os.getenv("SEARCH_SNAPSHOT_SIZE", "256")),
+    ttl=float(os.getenv("SEARCH_SNAPSHOT_TTL", "300")),
+)
+# by default cursors reach as deep as offset paging can
+SNAPSHOT_MAX_ITEMS = int(os.getenv("SEARCH_SNAPSHOT_MAX_ITEMS", str(MAX_SEARCH_OFFSET + MAX_SEARCH_LIMIT)))
+
+
+def with_facet_filters(q: str, resolution: Optional[str] = None, codec: Optional[str] = None,
+                       year: Optional[int] = None, container: Optional[str] = None) -> str:
+    """Append facet query parameters to `q` as query-language filters"""
+    terms = [q]
+    if resolution:
+        terms.append(f"res:{resolution}")
+    if codec:
+        terms.append(f"codec:{codec}")
+    if year is not None:
+        terms.append(f"year={year}")
+    if container:
+        terms.append(f"container:{container}")
+    return " ".join(terms)
+
 
 @app.get("/api/search", response_model=List[SearchItem])
-def search(
-    q: str = Query("", description="Search query"),
+async def search(
+    response: Response,
+    q: str = Query("", description="Search query; may include filters such as seeds>100 size<4GB source:linux res:720p"),
     sources: Optional[str] = Query(None, description="Comma-separated list of providers to use (e.g., 'demo,linux')"),
+    limit: int = Query(50, ge=1, le=MAX_SEARCH_LIMIT, description="Maximum number of results to return"),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET, description="Number of ranked results to skip"),
+    sort: Literal["relevance", "seeds", "peers", "size"] = Query("relevance", description="Ranking order"),
+    cursor: Optional[str] = Query(None, description="Opaque X-Next-Cursor value from a previous page"),
+    resolution: Optional[str] = Query(None, description="Facet filter, e.g. 720p, 1080p, 4k"),
+    codec: Optional[str] = Query(None, description="Facet filter, e.g. h264, x265"),
+    year: Optional[int] = Query(None, description="Facet filter: release year"),
+    container: Optional[str] = Query(None, description="Facet filter: file extension, e.g. mkv, iso"),
+    collapse: bool = Query(False, description="Return one result per cluster of near-duplicate titles"),
 ):
     """
     Aggregated search across multiple providers.
     - sources: optional comma-separated provider keys. If not set, use all registered providers.
     - Each provider should return SearchItem entries with legal/public domain examples by default.
 
+    - q may mix free text with filters (see query_lang): seeds/peers/size/year comparisons,
+      source:<provider>, res:<resolution>, codec:<codec> and container:<ext>. The resolution,
+      codec, year and container parameters are shorthands for the same facet filters;
+      /api/search/facets returns their counts.
+    - collapse=true groups near-duplicate titles (MinHash/LSH, see near_dup) and returns the
+      best-seeded item of each group with its cluster_size.
+    - Providers run concurrently, each bounded by its own timeout, and the whole call by
+      SEARCH_DEADLINE_SECONDS. Providers that did not answer in time are listed in the
+      X-Search-Timed-Out response header, providers that raised in X-Search-Failed and
+      providers skipped because their circuit breaker is open in X-Search-Skipped; their
+      results are left out.
+    - Results are cached per normalized query and provider set (see /api/admin/cache).
+    - Results are ranked by `sort` and only the requested page is returned; the number of
+      matches before paging is in the X-Total-Count header.
+    - When more results exist, X-Next-Cursor holds a cursor for the next page. Passing it
+      back reads from a snapshot of the ranked results; q, sources, sort and offset are
+      then ignored. Expired cursors get 410 Gone. Every page reports the first page's
+      X-Total-Count; if the snapshot holds fewer results than that (SEARCH_SNAPSHOT_MAX_ITEMS),
+      X-Pageable-Count says how many cursors can reach.
+
     Note: For production, plug in additional providers that query external indexes/RSS feeds
     in compliance with their Terms of Service and applicable law.
     """
-    selected = [k.strip() for k in sources.split(',')] if sources else list(PROVIDERS.keys())
-
-    results: List[SearchItem] = []
-    for key in selected:
-        provider = PROVIDERS.get(key)
-        if not provider:
-            continue
+    if cursor:
         try:
-            items = provider(q)
-            results.extend(items)
-        except Exception:
-            # fail closed per provider
-            continue
+            page, next_cursor, total, pageable = SNAPSHOTS.page(cursor, limit)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        except CursorExpired:
+            raise HTTPException(status_code=410, detail="Cursor expired, repeat the search")
+        response.headers["X-Total-Count"] = str(total)
+        if pageable < total:
+            response.headers["X-Pageable-Count"] = str(pageable)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return page
 
-    # simple de-duplication by magnet hash (btih)
-    seen = set()
-    unique: List[SearchItem] = []
-    for item in results:
-        btih = None
-        try:
-            # magnet:?xt=urn:btih:<hash>
-            if 'magnet:' in item.magnet:
-                for part in item.magnet.split('&'):
-                    if 'btih' in part:
-                        btih = part.split('btih:')[-1]
-                        break
-        except Exception:
-            pass
-        key = btih or item.magnet
-        if key not in seen:
-            seen.add(key)
-            unique.append(item)
-
-    # if everything filtered out (e.g., invalid provider values), fall back to demo
-    if not unique:
+    q = normalize_query(with_facet_filters(q, resolution, codec, year, container))
+    query = compile_query(q)
+    providers = select_providers(sources, query)
+
+    unique, timed_out, failed, skipped = await cached_aggregate(q, providers)
+    if timed_out:
+        response.headers["X-Search-Timed-Out"] = ",".join(timed_out)
+    if failed:
+        response.headers["X-Search-Failed"] = ",".join(failed)
+    if skipped:
+        response.headers["X-Search-Skipped"] = ",".join(skipped)
+
+    # if everything filtered out (e.g., invalid provider values), fall back to demo,
+    # unless the sources parameter or a source: filter rules the demo provider out
+    if not unique and demo_fallback_allowed(sources, query):
         unique = provider_demo(q)
 
-    return unique
+    if collapse:
+        unique = [
+            item.model_copy(update={"cluster_size": count})
+            for item, count in collapse_near_duplicates(unique)
+        ]
+
+    response.headers["X-Total-Count"] = str(len(unique))
+    end = offset + limit
+    pageable = min(len(unique), max(end, SNAPSHOT_MAX_ITEMS))
+    if pageable < len(unique):
+        response.headers["X-Pageable-Count"] = str(pageable)
+    if end < pageable:
+        # later pages slice a snapshot that is ranked only once its first cursor is read, and
+        # identical first pages over the same cached result set share it
+        response.headers["X-Next-Cursor"] = SNAPSHOTS.save(
+            unique, end, total=len(unique),
+            rank=lambda items: top_k(items, pageable, sort=sort, query=query.text),
+            key=(q, tuple(sorted(p.name for p in providers)), sort, collapse, pageable),
+        )
+    return top_k(unique, end, sort=sort, query=query.text)[offset:]
+
+
+class FacetCounts(BaseModel):
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+
+@app.get("/api/search/facets", response_model=FacetCounts)
+async def search_facets(
+    q: str = Query("", description="Search query, as for /api/search"),
+    sources: Optional[str] = Query(None, description="Comma-separated list of providers to use (e.g., 'demo,linux')"),
+    resolution: Optional[str] = Query(None),
+    codec: Optional[str] = Query(None),
+    year: Optional[int] = Query(None),
+    container: Optional[str] = Query(None),
+):
+    """
+    Facet counts (resolution, codec, year, container) over the full, unpaged result set of
+    the matching /api/search call. Shares its caches, so asking for both is cheap.
+    """
+    q = normalize_query(with_facet_filters(q, resolution, codec, year, container))
+    items, _, _, _ = await cached_aggregate(q, select_providers(sources, compile_query(q)))
+
+    counts: Dict[str, Counter] = {field: Counter() for field in RELEASE_FIELDS}
+    for item in items:
+        for field in RELEASE_FIELDS:
+            value = getattr(item, field)
+            if value is not None:
+                counts[field][str(value)] += 1
+    return FacetCounts(
+        total=len(items),
+        facets={field: dict(counter.most_common()) for field, counter in counts.items()},
+    )
+
+
+# ----------------------
+# Batch search
+# ----------------------
+MAX_BATCH_QUERIES = 500
+BATCH_CONCURRENCY = int(os.getenv("SEARCH_BATCH_CONCURRENCY", "16"))
+
+
+class BatchQuery(BaseModel):
+    q: str = ""
+    sources: Optional[str] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchQuery] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES)
+    limit: int = Field(50, ge=1, le=MAX_SEARCH_LIMIT)
+    sort: Literal["relevance", "seeds", "peers", "size"] = "relevance"
+
+
+class BatchSearchResponse(BaseModel):
+    results: Dict[str, List[SearchItem]]
+    # providers that timed out / raised / were skipped by an open breaker, per query (only queries where some did)
+    timed_out: Dict[str, List[str]] = {}
+    failed: Dict[str, List[str]] = {}
+    skipped: Dict[str, List[str]] = {}
+
+
+@app.post("/api/search/batch", response_model=BatchSearchResponse)
+async def search_batch(body: BatchSearchRequest):
+    """
+    Run many searches in one round trip, results keyed by each query's `q`.
+    Queries share the result cache, per-provider caches and in-flight provider calls,
+    so overlapping queries and source sets reach each provider once. Unlike /api/search,
+    empty results are returned as-is (no demo fallback).
+    """
+    keys = [b.q for b in body.queries]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Duplicate q values in batch")
+
+    gate = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(b: BatchQuery) -> Tuple[List[SearchItem], List[str], List[str], List[str]]:
+        q = normalize_query(b.q)
+        query = compile_query(q)
+        async with gate:
+            items, timed_out, failed, skipped = await cached_aggregate(q, select_providers(b.sources, query))
+        return top_k(items, body.limit, sort=body.sort, query=query.text), timed_out, failed, skipped
+
+    outcomes = await asyncio.gather(*(run(b) for b in body.queries))
+    return BatchSearchResponse(
+        results={key: items for key, (items, _, _, _) in zip(keys, outcomes)},
+        timed_out={key: timed_out for key, (_, timed_out, _, _) in zip(keys, outcomes) if timed_out},
+        failed={key: failed for key, (_, _, failed, _) in zip(keys, outcomes) if failed},
+        skipped={key: skipped for key, (_, _, _, skipped) in zip(keys, outcomes) if skipped},
+    )
+
+
+# ----------------------
+# Typeahead suggestions
+# ----------------------
+MAX_SUGGEST_LIMIT = 20
+
+
+class Suggestion(BaseModel):
+    title: str
+    seeds: int = 0
+    source: Optional[str] = None
+
+
+@app.get("/api/suggest", response_model=List[Suggestion])
+async def suggest(
+    q: str = Query("", description="Prefix typed so far"),
+    sources: Optional[str] = Query(None, description="Comma-separated list of providers to use (e.g., 'demo,linux')"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGEST_LIMIT, description="Maximum number of suggestions"),
+):
+    """
+    Typeahead suggestions from the prefix indexes of the provider catalogs, most seeded first.
+    Only providers backed by a local catalog contribute; nothing remote is called.
+    """
+    # each catalog returns at most `limit`, so this merge is tiny
+    candidates = []
+    for p in select_providers(sources):
+        if p.catalog is not None:
+            candidates.extend((seeds, title, p.name) for title, seeds in p.catalog.suggest(q, limit))
+
+    suggestions: List[Suggestion] = []
+    seen = set()
+    for seeds, title, source in sorted(candidates, key=lambda c: c[0], reverse=True):
+        if title in seen:
+            continue
+        seen.add(title)
+        suggestions.append(Suggestion(title=title, seeds=seeds, source=source))
+        if len(suggestions) == limit:
+            break
+    return suggestions
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@app.get("/api/search/stream")
+async def search_stream(
+    q: str = Query("", description="Search query"),
+    sources: Optional[str] = Query(None, description="Comma-separated list of providers to use (e.g., 'demo,linux')"),
+):
+    """
+    Streaming variant of /api/search as Server-Sent Events.
+    - `items` is sent as soon as each provider answers: {"provider", "items": [{"id", ...SearchItem}]}.
+      Results are merged incrementally; an `id` seen before carries the updated, merged item.
+    - `summary` ends the stream: {"total", "providers", "timed_out", "failed", "skipped"};
+      `skipped` lists providers not called because their circuit breaker is open.
+    """
+    q = normalize_query(q)
+    providers = select_providers(sources, compile_query(q))
+
+    async def events():
+        merger = ResultMerger()
+
+        def batch(name: str, items: List[SearchItem]) -> str:
+            keys = dict.fromkeys(merger.add(item) for item in items)
+            payload = [{"id": key, **merger.get(key).model_dump()} for key in keys]
+            return _sse("items", {"provider": name, "items": payload})
+
+        uncached: List[Provider] = []
+        for p in providers:
+            items = p.cached(q)
+            if items is None:
+                uncached.append(p)
+            else:
+                yield batch(p.name, items)
+        allowed, skipped = admit(uncached)
+        to_call = {p.name: p for p in allowed}
+
+        timed_out, failed = [], []
+        async for name, status, value in iter_fan_out(
+            {name: call_provider(p, q) for name, p in to_call.items()},
+            deadline=SEARCH_DEADLINE_SECONDS,
+        ):
+            if status == OK:
+                to_call[name].remember(q, value)
+                yield batch(name, value)
+            elif status == TIMEOUT:
+                timed_out.append(name)
+            else:
+                failed.append(name)
+
+        yield _sse("summary", {
+            "total": len(merger),
+            "providers": [p.name for p in providers],
+            "timed_out": timed_out,
+            "failed": failed,
+            "skipped": skipped,
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/admin/cache")
+def cache_stats():
+    """Hit/miss counters and occupancy of the search result cache and the per-provider caches"""
+    return {
+        "search": SEARCH_CACHE.stats(),
+        "snapshots": SNAPSHOTS.stats(),
+        "single_flight": SEARCH_FLIGHTS.stats(),
+        "providers": {name: p.cache.stats() for name, p in PROVIDERS.items() if p.cache is not None},
+    }
+
+
+@app.get("/api/admin/providers")
+def provider_health():
+    """Circuit breaker state, error rate, latency (EWMA, p95), hedging and bulkhead counters of every provider"""
+    return {
+        name: {
+            "timeout": p.timeout,
+            **p.health.snapshot(),
+            "hedging": p.hedge_budget.stats() if p.hedge else None,
+            "bulkhead": p.bulkhead.stats(),
+        }
+        for name, p in PROVIDERS.items()
+    }
+
+
+@app.get("/api/admin/feeds")
+def feed_stats():
+    """Polling state of every RSS/Torznab feed: conditional-GET hits, items added, last error"""
+    return {name: poller.stats() for name, poller in FEED_POLLERS.items()}
 
 
 if __name__ == "__main__":
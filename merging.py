@@ -0,0 +1,101 @@
+"""
+Result Merging
+
+Single-pass merge of provider results keyed on canonical infohash. When several
+providers return the same torrent, the first item's title and metadata are kept,
+tracker lists are unioned into its magnet, seeds/peers take the best reported
+value and every contributing source is recorded.
+
+Items carry their parsed magnet (`item.link`, see SearchItem), so merging never
+parses a magnet URI itself.
+"""
+
+from dataclasses import replace
+from typing import Any, Dict, Hashable, List, Optional
+
+from magnet import MagnetLink, add_trackers
+
+
+class _Entry:
+    __slots__ = ("item", "link", "seeds", "peers", "size", "size_bytes", "trackers", "sources", "merged")
+
+    def __init__(self, item: Any, link: Optional[MagnetLink]):
+        self.item = item
+        self.link = link
+        self.seeds = item.seeds or 0
+        self.peers = item.peers or 0
+        self.size = item.size
+        self.size_bytes = item.size_bytes
+        # filled in on the first merge; most items are never merged
+        self.trackers: Optional[List[str]] = None
+        self.sources = list(item.sources) if item.sources else ([item.source] if item.source else [])
+        self.merged = False
+
+
+class ResultMerger:
+    """Accumulates items from any number of providers, merging duplicates as they arrive"""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _Entry] = {}
+
+    @staticmethod
+    def key_of(item: Any) -> Hashable:
+        link = item.link
+        return (link.infohash if link else None) or item.magnet
+
+    def add(self, item: Any) -> Hashable:
+        """Merge `item` in and return its dedup key"""
+        link = item.link
+        key = (link.infohash if link else None) or item.magnet
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = _Entry(item, link)
+            return key
+
+        entry.merged = True
+        entry.seeds = max(entry.seeds, item.seeds or 0)
+        entry.peers = max(entry.peers, item.peers or 0)
+        if not entry.size and item.size:
+            entry.size, entry.size_bytes = item.size, item.size_bytes
+        if entry.trackers is None:
+            entry.trackers = list(entry.link.trackers) if entry.link else []
+        if link:
+            for tr in link.trackers:
+                if tr not in entry.trackers:
+                    entry.trackers.append(tr)
+        for source in (item.sources or ([item.source] if item.source else [])):
+            if source not in entry.sources:
+                entry.sources.append(source)
+        return key
+
+    def extend(self, items: List[Any]) -> None:
+        for item in items:
+            self.add(item)
+
+    def get(self, key: Hashable) -> Any:
+        """The merged item for `key`"""
+        entry = self._entries[key]
+        if not entry.merged:
+            if entry.item.sources or not entry.sources:
+                return entry.item
+            return entry.item.model_copy(update={"sources": list(entry.sources)})
+        link = entry.link
+        merged = entry.item.model_copy(update={
+            "magnet": add_trackers(entry.item.magnet, entry.trackers, known=link.trackers if link else ()),
+            "seeds": entry.seeds,
+            "peers": entry.peers,
+            "size": entry.size,
+            "size_bytes": entry.size_bytes,
+            "sources": list(entry.sources),
+        })
+        if link:
+            # the copy keeps the original's parsed link; it now announces the unioned trackers
+            merged._link = replace(link, trackers=tuple(entry.trackers))
+        return merged
+
+    def items(self) -> List[Any]:
+        """All merged items, in first-seen order"""
+        return [self.get(key) for key in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,121 @@
+"""
+Near-duplicate Clustering
+
+Different infohashes often carry the same release under slightly different
+titles ("Movie.2010.1080p.x264" and "Movie 2010 1080p x264-GRP"). Titles are
+reduced to their normalized tokens, without a trailing scene release group, and
+then to MinHash signatures over word unigrams and bigrams (computed once per
+title at catalog ingest and memoized). They are grouped with locality-sensitive
+hashing: signatures are cut into bands and titles sharing any band bucket become
+candidates, confirmed by their estimated Jaccard similarity.
+
+Shared boilerplate ("720p (WebTorrent demo)", "LTS Desktop amd64") must not make
+different releases look alike, so the threshold is high and titles are only
+compared at all when their numeric tokens (versions, years, resolutions, codecs)
+are the same: "Ubuntu 22.04.4" and "Ubuntu 24.04" never collapse.
+"""
+
+import random
+import re
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from textnorm import tokenize
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MIN_SIMILARITY = 0.8
+
+# "-GRP" after a codec/resolution/channel token ending in a digit: "x264-GRP", "DDP5.1-FLUX"
+_RELEASE_GROUP_RE = re.compile(r"(?<=\d)-[A-Za-z][A-Za-z0-9]*\s*$")
+
+_rng = random.Random(0x5EED)
+_SEEDS = np.array([_rng.getrandbits(64) for _ in range(NUM_PERM)], dtype=np.uint64)
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer (uint64 arithmetic wraps): each seed gives an independent-looking
+    # permutation, so the minimum does not just follow the smallest shingle hash
+    x = (x ^ (x >> np.uint64(30))) * _M1
+    x = (x ^ (x >> np.uint64(27))) * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+@lru_cache(maxsize=32768)
+def release_tokens(title: str) -> Tuple[str, ...]:
+    """Normalized tokens of `title`, without a trailing scene release group"""
+    return tokenize(_RELEASE_GROUP_RE.sub("", title))
+
+
+@lru_cache(maxsize=32768)
+def numeric_tokens(title: str) -> Tuple[str, ...]:
+    """The tokens of `title` containing a digit, in order; titles only cluster when these are equal"""
+    return tuple(token for token in release_tokens(title) if any(ch.isdigit() for ch in token))
+
+
+def shingles(title: str) -> set:
+    tokens = release_tokens(title)
+    if not tokens:
+        return {""}
+    return set(tokens) | {a + " " + b for a, b in zip(tokens, tokens[1:])}
+
+
+@lru_cache(maxsize=32768)
+def title_signature(title: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values) of `title`"""
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles(title)), dtype=np.uint64)
+    return _mix(_SEEDS[:, None] ^ hashes[None, :]).min(axis=1)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def cluster(signatures: List[np.ndarray], min_similarity: float = MIN_SIMILARITY,
+            keys: Optional[Sequence[Hashable]] = None) -> List[int]:
+    """
+    Cluster id (index of the cluster's first member) for each signature. With `keys`,
+    only signatures with equal keys can share a cluster.
+    """
+    parent = list(range(len(signatures)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[Tuple[Hashable, int, bytes], int] = {}
+    for i, sig in enumerate(signatures):
+        group = keys[i] if keys is not None else None
+        for band in range(BANDS):
+            key = (group, band, sig[band * ROWS:(band + 1) * ROWS].tobytes())
+            j = buckets.setdefault(key, i)
+            if j == i:
+                continue
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j and similarity(sig, signatures[j]) >= min_similarity:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+    return [find(i) for i in range(len(signatures))]
+
+
+def collapse(items: List[Any], weight: Callable[[Any], float] = lambda item: item.seeds or 0) -> List[Tuple[Any, int]]:
+    """
+    One (representative, cluster size) pair per cluster of near-duplicate titles, in order
+    of each cluster's first item. The representative is the member with the largest `weight`.
+    """
+    clusters = cluster(
+        [title_signature(item.title) for item in items],
+        keys=[numeric_tokens(item.title) for item in items],
+    )
+    groups: Dict[int, List[Any]] = {}
+    for item, root in zip(items, clusters):
+        groups.setdefault(root, []).append(item)
+    return [(max(members, key=weight), len(members)) for members in groups.values()]
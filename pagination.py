@@ -0,0 +1,102 @@
+"""
+Cursor Pagination
+
+The first page of a search stores the merged result set as a short-lived
+snapshot. Later pages are slices of that snapshot addressed by an opaque cursor
+token, so scrolling never re-runs the provider fan-out. A snapshot can be ranked
+lazily, when its first cursor is read, so a first page that is never scrolled
+past costs no more than its own bounded top-k; identical first pages over the
+same (cached) result set share one snapshot.
+"""
+
+import base64
+import binascii
+import json
+import secrets
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+from caching import MISS, TTLCache
+
+
+class CursorExpired(Exception):
+    """The snapshot a cursor points into has been evicted or has expired"""
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    raw = json.dumps({"s": snapshot_id, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor(); raises ValueError for anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        snapshot_id, offset = data["s"], data["o"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(snapshot_id, str) or not isinstance(offset, int) or offset < 0:
+        raise ValueError("Malformed cursor")
+    return snapshot_id, offset
+
+
+class _Snapshot:
+    __slots__ = ("source", "items", "total", "rank")
+
+    def __init__(self, source: Sequence[Any], total: int, rank: Optional[Callable[[Sequence[Any]], Sequence[Any]]]):
+        self.source = source
+        self.items: Optional[Tuple[Any, ...]] = None if rank is not None else tuple(source)
+        self.total = total
+        self.rank = rank
+
+    def ranked(self) -> Tuple[Any, ...]:
+        if self.items is None:
+            self.items = tuple(self.rank(self.source))
+            self.rank = None
+        return self.items
+
+
+class SnapshotStore:
+    """Short-lived, bounded store of ranked result sets addressed by cursor"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> snapshot id, for reusing the snapshot of an identical first page
+        self._ids = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def save(self, items: Sequence[Any], next_offset: int, total: Optional[int] = None,
+             rank: Optional[Callable[[Sequence[Any]], Sequence[Any]]] = None,
+             key: Optional[Hashable] = None) -> str:
+        """
+        Store `items` and return the cursor for the page starting at `next_offset`. `total` is
+        the size of the full result set when the snapshot holds only its top part (default
+        len(items)). With `rank`, `items` are stored as they are and replaced by `rank(items)`
+        when the first cursor is read. With `key`, saving the very same `items` object under
+        the same key again returns a cursor into the existing snapshot.
+        """
+        total = len(items) if total is None else total
+        if key is not None:
+            snapshot_id, state = self._ids.get(key)
+            if state != MISS:
+                snapshot, state = self._cache.get(snapshot_id)
+                if state != MISS and snapshot.source is items:
+                    return encode_cursor(snapshot_id, next_offset)
+        snapshot_id = secrets.token_urlsafe(12)
+        self._cache.set(snapshot_id, _Snapshot(items, total, rank))
+        if key is not None:
+            self._ids.set(key, snapshot_id)
+        return encode_cursor(snapshot_id, next_offset)
+
+    def page(self, cursor: str, limit: int) -> Tuple[List[Any], Optional[str], int, int]:
+        """Returns (items, next cursor or None, total result count, number of results in the snapshot)"""
+        snapshot_id, offset = decode_cursor(cursor)
+        snapshot, state = self._cache.get(snapshot_id)
+        if state == MISS:
+            raise CursorExpired(snapshot_id)
+        items = snapshot.ranked()
+        end = offset + limit
+        next_cursor = encode_cursor(snapshot_id, end) if end < len(items) else None
+        return list(items[offset:end]), next_cursor, snapshot.total, len(items)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
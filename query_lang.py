@@ -0,0 +1,119 @@
+"""
+Structured Search Queries
+
+A small query grammar on top of free text:
+
+    ubuntu seeds>100 size<4GB source:linux res:1080p
+
+Numeric filters: seeds, peers, size, year with >, >=, <, <=, = (size takes units: 700MB, 4GB, 1.5GiB).
+Field filters: source:<provider>[,<provider>...] and the release facets res:<resolution>
+(alias resolution:), codec:<codec>, container:<extension> (see release_info).
+Everything else is free text. Terms that look like filters but do not parse stay text.
+
+Each distinct query string is compiled once (memoized) into a CompiledQuery. It
+carries the numeric and facet filters in structured form, for vectorized
+evaluation over columnar catalogs, and a predicate built from prebuilt closures
+for plain item lists.
+"""
+
+import operator
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+from release_info import normalize_facet
+from sizes import parse_size
+
+_NUMERIC_RE = re.compile(r"^(seeds|peers|size|year)(>=|<=|>|<|=)(.+)$")
+_FIELD_RE = re.compile(r"^(source|res|resolution|codec|container):(.+)$")
+
+_OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "=": operator.eq}
+
+
+Predicate = Callable[[Any], bool]
+# (item attribute, comparison operator, integer operand); operators work element-wise on arrays too
+NumericFilter = Tuple[str, Callable[[Any, Any], Any], int]
+
+# query field -> item attribute
+_NUMERIC_FIELDS = {"seeds": "seeds", "peers": "peers", "size": "size_bytes", "year": "year"}
+_FACET_FIELDS = {"res": "resolution", "resolution": "resolution", "codec": "codec", "container": "container"}
+# attributes that may be unknown; unknown values never match a filter on them
+OPTIONAL_NUMERIC = {"size_bytes", "year"}
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    text: str                                   # free-text part, for index/text matching
+    sources: Tuple[str, ...] = ()               # restrict to these providers (empty: no restriction)
+    numeric: Tuple[NumericFilter, ...] = ()     # integer filters, for columnar (vectorized) evaluation
+    facets: Tuple[Tuple[str, str], ...] = ()    # (release attribute, canonical value) equality filters
+    predicate: Optional[Predicate] = None       # all filters on one item; None when the query has none
+
+
+def _numeric_filter(field: str, op: str, raw: str) -> Optional[NumericFilter]:
+    if field == "size":
+        value = parse_size(raw)
+    else:
+        try:
+            value = int(raw)
+        except ValueError:
+            value = None
+    if value is None:
+        return None
+    return _NUMERIC_FIELDS[field], _OPERATORS[op], value
+
+
+def _numeric_check(attr: str, compare: Callable[[Any, Any], Any], value: int) -> Predicate:
+    getter = operator.attrgetter(attr)
+    if attr in OPTIONAL_NUMERIC:
+        return lambda item: getter(item) is not None and compare(getter(item), value)
+    return lambda item: compare(getter(item) or 0, value)
+
+
+def _facet_check(attr: str, value: str) -> Predicate:
+    getter = operator.attrgetter(attr)
+    return lambda item: getter(item) == value
+
+
+@lru_cache(maxsize=1024)
+def compile_query(q: str) -> CompiledQuery:
+    """Split `q` into free text, a source restriction and compiled filters"""
+    text: List[str] = []
+    sources: List[str] = []
+    numeric: List[NumericFilter] = []
+    facets: List[Tuple[str, str]] = []
+
+    for term in q.split():
+        lowered = term.lower()
+        match = _NUMERIC_RE.match(lowered)
+        if match:
+            parsed = _numeric_filter(*match.groups())
+            if parsed is not None:
+                numeric.append(parsed)
+                continue
+        match = _FIELD_RE.match(lowered)
+        if match:
+            field, value = match.groups()
+            if field == "source":
+                sources.extend(s for s in value.split(",") if s)
+            else:
+                attr = _FACET_FIELDS[field]
+                facets.append((attr, normalize_facet(attr, value)))
+            continue
+        text.append(term)
+
+    checks = [_numeric_check(*f) for f in numeric] + [_facet_check(*f) for f in facets]
+    predicate: Optional[Predicate] = None
+    if len(checks) == 1:
+        predicate = checks[0]
+    elif checks:
+        predicate = lambda item: all(check(item) for check in checks)
+
+    return CompiledQuery(
+        text=" ".join(text),
+        sources=tuple(dict.fromkeys(sources)),
+        numeric=tuple(numeric),
+        facets=tuple(dict.fromkeys(facets)),
+        predicate=predicate,
+    )
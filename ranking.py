@@ -0,0 +1,61 @@
+"""
+Result Ranking
+
+Scores search results by how well the title matches the query and by swarm
+health (seeds, peers), and selects the top k with a bounded heap rather than
+sorting the whole result set.
+"""
+
+import heapq
+import math
+from typing import Any, Callable, List
+
+from textnorm import normalize_text, tokenize
+
+SORT_KEYS = ("relevance", "seeds", "peers", "size")
+
+
+def match_score(query_tokens: List[str], phrase: str, title: str) -> float:
+    """0..1 share of query tokens found in `title`, with a bonus for the whole (normalized) phrase"""
+    if not query_tokens:
+        return 0.0
+    title_tokens = set(tokenize(title))
+    score = 0.0
+    for token in query_tokens:
+        if token in title_tokens:
+            score += 1.0
+        elif any(t.startswith(token) for t in title_tokens):
+            score += 0.5
+    score /= len(query_tokens)
+    if phrase and phrase in normalize_text(title):
+        score += 0.5
+    return score / 1.5
+
+
+def sort_key(sort: str, query: str) -> Callable[[Any], float]:
+    """Key function for `sort` ("relevance", "seeds", "peers" or "size"); larger is better"""
+    if sort == "size":
+        return lambda item: item.size_bytes or 0
+    if sort == "seeds":
+        return lambda item: item.seeds or 0
+    if sort == "peers":
+        return lambda item: item.peers or 0
+
+    query_tokens = list(dict.fromkeys(tokenize(query)))
+    phrase = normalize_text(query)
+
+    def relevance(item: Any) -> float:
+        # text match dominates; swarm health breaks ties and orders weak matches
+        return (
+            10.0 * match_score(query_tokens, phrase, item.title)
+            + math.log1p(item.seeds or 0)
+            + 0.5 * math.log1p(item.peers or 0)
+        )
+    return relevance
+
+
+def top_k(items: List[Any], k: int, sort: str = "relevance", query: str = "") -> List[Any]:
+    """The best `k` items by `sort`, best first (stable for equal scores)"""
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, items, key=sort_key(sort, query))
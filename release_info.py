@@ -0,0 +1,83 @@
+"""
+Release-name Metadata
+
+Extracts resolution, video codec, year and container from release titles such as
+"Sintel 720p (WebTorrent demo)" or "Movie.2010.1080p.BluRay.x265.mkv". It runs once
+per item when the item is created, and the results are stored as indexed fields
+that can be filtered and counted without looking at titles again.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+RELEASE_FIELDS = ("resolution", "codec", "year", "container")
+
+_RESOLUTION_RE = re.compile(r"(?<![a-z0-9])(4320|2160|1440|1080|720|576|480|360)[pi](?![a-z0-9])|(?<![a-z0-9])(4k|uhd|8k)(?![a-z0-9])")
+_CODEC_RE = re.compile(r"(?<![a-z0-9])(x\.?264|h\.?264|avc|x\.?265|h\.?265|hevc|av1|vp9|xvid|divx)(?![a-z0-9])")
+# a year, not part of a version number such as 2019.04 (but "2012.10bit" is a year and a tag);
+# titles can contain years of their own ("Blade Runner 2049 2017", "1984 (1956)"), so the
+# last one in the plausible range wins
+_YEAR_RE = re.compile(r"(?<!\d)(?<!\d\.)(19[2-9]\d|20\d\d)(?!\d)(?!\.\d{1,2}(?![\da-z]))")
+_CONTAINER_RE = re.compile(r"\.(mkv|mp4|m4v|avi|webm|mov|ts|iso|img)$")
+
+_RESOLUTION_ALIASES = {"4k": "2160p", "uhd": "2160p", "8k": "4320p"}
+_CODEC_ALIASES = {
+    "x264": "h264", "h264": "h264", "avc": "h264",
+    "x265": "h265", "h265": "h265", "hevc": "h265",
+    "av1": "av1", "vp9": "vp9", "xvid": "xvid", "divx": "xvid",
+}
+
+
+@dataclass(frozen=True)
+class ReleaseInfo:
+    resolution: Optional[str] = None  # canonical, e.g. "720p", "2160p"
+    codec: Optional[str] = None       # canonical, e.g. "h264", "h265"
+    year: Optional[int] = None
+    container: Optional[str] = None   # file extension, e.g. "mkv", "iso"
+
+
+def normalize_facet(field: str, value: str) -> str:
+    """Canonical form of a user-supplied facet value ("4K" -> "2160p", "x264" -> "h264")"""
+    value = value.strip().lower()
+    if field == "resolution":
+        if value.isdigit():
+            return f"{value}p"
+        return _RESOLUTION_ALIASES.get(value, value.replace("i", "p") if value[:-1].isdigit() else value)
+    if field == "codec":
+        return _CODEC_ALIASES.get(value.replace(".", ""), value)
+    if field == "container":
+        return value.lstrip(".")
+    return value
+
+
+@lru_cache(maxsize=8192)
+def extract_release_info(title: str, file_name: Optional[str] = None) -> ReleaseInfo:
+    """Metadata found in `title` and, where the title lacks it, in `file_name` (e.g. a magnet's dn)"""
+    texts = [t.lower() for t in (title, file_name) if t]
+
+    resolution = codec = container = None
+    year = None
+    for text in texts:
+        if resolution is None:
+            match = _RESOLUTION_RE.search(text)
+            if match:
+                resolution = f"{match.group(1)}p" if match.group(1) else _RESOLUTION_ALIASES[match.group(2)]
+        if codec is None:
+            match = _CODEC_RE.search(text)
+            if match:
+                codec = _CODEC_ALIASES[match.group(1).replace(".", "")]
+        if year is None:
+            # a release cannot be from much later than now
+            latest = date.today().year + 1
+            candidates = [int(y) for y in _YEAR_RE.findall(text) if int(y) <= latest]
+            if candidates:
+                year = candidates[-1]
+        if container is None:
+            match = _CONTAINER_RE.search(text.strip())
+            if match:
+                container = match.group(1)
+
+    return ReleaseInfo(resolution=resolution, codec=codec, year=year, container=container)
@@ -0,0 +1,160 @@
+"""
+Remote Providers
+
+Search providers backed by an HTTP API share one pooled async client
+(HTTP_POOL): connections are kept alive and reused across searches, HTTP/2 is
+negotiated when the `h2` package is installed, concurrent requests per host are
+capped, and transient failures (connection errors, 429/5xx) are retried with
+jittered exponential backoff. A provider only describes its request and how to
+parse the response:
+
+    class MyProvider(RemoteProvider):
+        path = "/api/search"
+
+        def parse(self, response):
+            return [{"title": r["name"], "magnet": r["magnet"]} for r in response.json()]
+
+    remote = MyProvider("mine", "https://example.org", item_type=SearchItem)
+    Provider("mine", fetch=remote.search, hedge=True)
+"""
+
+import asyncio
+import importlib.util
+import random
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HTTPPool:
+    """Shared AsyncClient with per-host concurrency limits and retries"""
+
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20, keepalive_expiry: float = 30.0,
+                 per_host: int = 8, timeout: float = 10.0, retries: int = 2, backoff: float = 0.1):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._client: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self.requests = 0
+        self.retried = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # created on first use so it binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": "torrent-streamer/1.0"},
+            )
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request through the pool. Connection errors and RETRY_STATUSES are retried up to
+        `retries` times (default: the pool's) with full-jitter exponential backoff; the last
+        response is returned as is, the last connection error is raised.
+        """
+        retries = self.retries if retries is None else retries
+        limit = self._host_limit(url)
+        for attempt in range(retries + 1):
+            self.requests += 1
+            try:
+                async with limit:
+                    response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+            self.retried += 1
+            await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        raise AssertionError("unreachable")
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Request whose body is read incrementally; the host slot is held until it is consumed. Not retried."""
+        async with self._host_limit(url):
+            self.requests += 1
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "open": self._client is not None and not self._client.is_closed,
+            "hosts": len(self._hosts),
+            "requests": self.requests,
+            "retried": self.retried,
+        }
+
+
+HTTP_POOL = HTTPPool()
+
+
+class RemoteProvider:
+    """
+    Base class for HTTP search providers. Subclasses set `path` and override params()
+    and parse(); search() is the coroutine to register as a Provider's `fetch`. It receives
+    only the free text of a query: the Provider applies filters (seeds>100, res:720p...) to
+    the parsed items.
+    """
+
+    path = "/search"
+    method = "GET"
+
+    def __init__(self, name: str, base_url: str, item_type: Optional[type] = None,
+                 pool: Optional[HTTPPool] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.item_type = item_type
+        self.pool = pool or HTTP_POOL
+
+    def params(self, q: str) -> Dict[str, Any]:
+        return {"q": q}
+
+    def parse(self, response: httpx.Response) -> List[Dict[str, Any]]:
+        """Item fields (title, magnet, size, seeds, peers...) from a successful response"""
+        raise NotImplementedError
+
+    async def search(self, q: str) -> List[Any]:
+        response = await self.pool.request(self.method, self.base_url + self.path, params=self.params(q))
+        response.raise_for_status()
+        rows = self.parse(response)
+        if self.item_type is None:
+            return rows
+        return [self.item_type(**{"source": self.name, **row}) for row in rows]
+
+
+class JSONSearchProvider(RemoteProvider):
+    """A remote API answering GET {base_url}/search?q=... with a JSON list of items"""
+
+    def parse(self, response: httpx.Response) -> List[Dict[str, Any]]:
+        payload = response.json()
+        return payload.get("items", []) if isinstance(payload, dict) else payload
@@ -0,0 +1,129 @@
+"""
+Remote Provider Stub
+
+A small local HTTP server speaking the JSONSearchProvider protocol
+(GET /search?q=... -> JSON list of items), for exercising remote providers,
+retries and hedging without touching the network. Latency and failures
+(random, or the first N requests) are configurable, and the server counts
+the connections and requests it has seen.
+
+    python remote_stub.py --port 8765 --delay 0.2 --fail-rate 0.1
+    REMOTE_SEARCH_URLS="stub=http://127.0.0.1:8765" python main.py
+
+or in-process (see tests/test_remote.py):
+
+    with running_stub(delay=0.05, fail_first=1) as server:
+        ... server.url, server.connections, server.requests
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+STUB_ITEMS: List[dict] = [
+    {
+        "title": "Tears of Steel 1080p (stub)",
+        "magnet": "magnet:?xt=urn:btih:209c8226b299b308beaf2b9cd3fb49212dbd13ec&dn=Tears+of+Steel",
+        "size": "571MB",
+        "seeds": 120,
+        "peers": 30,
+    },
+    {
+        "title": "Cosmos Laundromat 2015 2160p x265 (stub)",
+        "magnet": "magnet:?xt=urn:btih:c9e15763f722f23e98a29decdfae341b98d53056&dn=Cosmos+Laundromat",
+        "size": "1.2GB",
+        "seeds": 45,
+        "peers": 12,
+    },
+]
+
+
+class StubServer(ThreadingHTTPServer):
+    def __init__(self, address, items: List[dict], delay: float = 0.0, fail_rate: float = 0.0,
+                 fail_first: int = 0):
+        super().__init__(address, Handler)
+        self.items = items
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.fail_first = fail_first
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, attr: str) -> int:
+        with self._lock:
+            value = getattr(self, attr) + 1
+            setattr(self, attr, value)
+            return value
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    server: StubServer
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/search":
+            return self._send(404, {"detail": "not found"})
+        n = self.server.count("requests")
+        time.sleep(self.server.delay)
+        if n <= self.server.fail_first or random.random() < self.server.fail_rate:
+            return self._send(503, {"detail": "stub failure"})
+        words = parse_qs(url.query).get("q", [""])[0].lower().split()
+        return self._send(200, [item for item in self.server.items if all(w in item["title"].lower() for w in words)])
+
+    def _send(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, items: Optional[List[dict]] = None,
+                delay: float = 0.0, fail_rate: float = 0.0, fail_first: int = 0) -> StubServer:
+    return StubServer((host, port), items or STUB_ITEMS, delay=delay, fail_rate=fail_rate, fail_first=fail_first)
+
+
+@contextmanager
+def running_stub(**kwargs) -> Iterator[StubServer]:
+    """Serve the stub on a free port in a background thread; yields the server (see StubServer.url)"""
+    server = make_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with 503")
+    args = parser.parse_args()
+    make_server(args.host, args.port, delay=args.delay, fail_rate=args.fail_rate,
+                fail_first=args.fail_first).serve_forever()
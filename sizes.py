@@ -0,0 +1,76 @@
+"""
+Size Normalization
+
+Parses human-readable sizes ("700MB", "3.8 GB", "3,8 Go", "1 234,5 MiB") into
+byte counts once, when items are ingested, so filters and sorts can compare
+integers. Like most torrent indexes, KB/MB/GB are treated as binary multiples
+(1024), the same as KiB/MiB/GiB.
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+_SIZE_RE = re.compile(r"^([\d.,'\s\u00a0\u202f]*\d[\d.,'\s\u00a0\u202f]*?)\s*([^\d\s.,]*)$")
+_GROUPING = str.maketrans("", "", " '\u00a0\u202f")
+_POWERS = {"k": 1, "m": 2, "g": 3, "t": 4, "p": 5}
+# "o"/"io" are the French octet spellings (Mo, Go, Gio)
+_SUFFIXES = {"", "b", "ib", "o", "io", "byte", "bytes"}
+_BYTE_UNITS = {"", "b", "o", "byte", "bytes", "octet", "octets"}
+
+
+def _parse_number(raw: str) -> Optional[float]:
+    raw = raw.translate(_GROUPING)
+    if "." in raw and "," in raw:
+        # whichever separator comes last is the decimal point
+        if raw.rfind(",") > raw.rfind("."):
+            raw = raw.replace(".", "").replace(",", ".")
+        else:
+            raw = raw.replace(",", "")
+    elif "," in raw:
+        head, _, tail = raw.rpartition(",")
+        if raw.count(",") > 1 or len(tail) == 3:
+            raw = raw.replace(",", "")        # 1,234 / 1,234,567: grouping
+        else:
+            raw = f"{head}.{tail}"            # 3,8: decimal comma
+    elif raw.count(".") > 1:
+        raw = raw.replace(".", "")            # 1.234.567: grouping
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _unit_multiplier(unit: str) -> Optional[int]:
+    unit = unit.lower()
+    if unit in _BYTE_UNITS:
+        return 1
+    power = _POWERS.get(unit[:1])
+    if power is None or unit[1:] not in _SUFFIXES:
+        return None
+    return 1024 ** power
+
+
+@lru_cache(maxsize=8192)
+def parse_size(value: Optional[str]) -> Optional[int]:
+    """Byte count of a human-readable size, or None if it cannot be parsed"""
+    if not value:
+        return None
+    match = _SIZE_RE.match(value.strip())
+    if not match:
+        return None
+    number = _parse_number(match.group(1))
+    multiplier = _unit_multiplier(match.group(2))
+    if number is None or multiplier is None or number < 0:
+        return None
+    return int(round(number * multiplier))
+
+
+def format_size(size_bytes: int) -> str:
+    """Human-readable form of a byte count ("1.2GB"), for providers that only report bytes"""
+    value = float(size_bytes)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024 or unit == "TB":
+            break
+        value /= 1024
+    return f"{int(value)}{unit}" if unit == "B" else f"{value:.1f}{unit}"
@@ -0,0 +1,28 @@
+"""Provider catalogs (catalog.py)"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import Catalog  # noqa: E402
+from main import SearchItem  # noqa: E402
+
+
+def item(title, btih):
+    return SearchItem(title=title, magnet=f"magnet:?xt=urn:btih:{btih}", seeds=1, source="feed")
+
+
+def test_upsert_ignores_items_without_a_valid_infohash():
+    catalog = Catalog("feed", item_type=SearchItem)
+    valid = "c9e15763f722f23e98a29decdfae341b98d53056"
+    added = catalog.upsert([item("One", "bogus1"), item("Two", "bogus2"), item("Three", valid)])
+    assert added == 1
+    assert [i.title for i in catalog.items] == ["Three"]
+    assert None not in catalog._snapshot.infohashes
+    assert catalog.upsert([item("Three again", valid), item("Four", "bogus4")]) == 0
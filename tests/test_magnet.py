@@ -0,0 +1,20 @@
+"""Magnet URI parsing (magnet.py)"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magnet import canonical_infohash  # noqa: E402
+
+
+@pytest.mark.parametrize("value", ["0x" + "a" * 38, "-" + "1" * 39, "+" + "1" * 39, "1_" * 20, " " * 40, "g" * 40])
+def test_only_plain_hex_is_a_hex_infohash(value):
+    assert canonical_infohash(value) is None
+
+
+def test_canonical_forms():
+    assert canonical_infohash("C9E15763F722F23E98A29DECDFAE341B98D53056") == "c9e15763f722f23e98a29decdfae341b98d53056"
+    assert canonical_infohash("MFRGGZDFMZTWQ2LKNNWG23TPOBYXE43U") == "6162636465666768696a6b6c6d6e6f7071727374"
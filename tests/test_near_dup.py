@@ -0,0 +1,40 @@
+"""Near-duplicate clustering (near_dup.py)"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_dup import collapse  # noqa: E402
+
+
+def sizes(*titles):
+    items = [SimpleNamespace(title=title, seeds=len(titles) - i) for i, title in enumerate(titles)]
+    return [(item.title, size) for item, size in collapse(items)]
+
+
+def test_demo_titles_stay_distinct():
+    titles = (
+        "Big Buck Bunny 720p (WebTorrent demo)",
+        "Sintel 720p (WebTorrent demo)",
+        "Tears of Steel 720p (WebTorrent demo)",
+        "Ubuntu 22.04.4 LTS Desktop amd64",
+        "Ubuntu 24.04 LTS Desktop amd64",
+        "Debian 12 netinst amd64",
+        "Debian 11 netinst amd64",
+        "Fedora Workstation 40 x86_64",
+    )
+    assert sizes(*titles) == [(title, 1) for title in titles]
+
+
+def test_release_variants_are_merged():
+    assert sizes("Movie.2010.1080p.x264", "Movie 2010 1080p x264-GRP") == [("Movie.2010.1080p.x264", 2)]
+    assert sizes("Movie.2010.1080p.x264", "Movie.2010.720p.x264") == [
+        ("Movie.2010.1080p.x264", 1),
+        ("Movie.2010.720p.x264", 1),
+    ]
@@ -0,0 +1,32 @@
+"""Cursor pagination snapshots (pagination.py)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pagination import SnapshotStore  # noqa: E402
+
+
+def test_snapshot_is_ranked_when_first_read():
+    calls = []
+
+    def rank(items):
+        calls.append(len(items))
+        return sorted(items, reverse=True)[:4]
+
+    store = SnapshotStore()
+    cursor = store.save([3, 1, 4, 1, 5, 9], 2, rank=rank)
+    assert calls == []
+    page, next_cursor, total, pageable = store.page(cursor, 1)
+    assert (page, total, pageable) == ([4], 6, 4)
+    assert store.page(next_cursor, 5)[:2] == ([3], None)
+    assert calls == [6]
+
+
+def test_identical_first_pages_share_a_snapshot():
+    store = SnapshotStore()
+    items = [1, 2, 3]
+    first = store.save(items, 1, key="q")
+    assert store.save(items, 1, key="q") == first
+    assert store.save(list(items), 1, key="q") != first
@@ -0,0 +1,22 @@
+"""Release-name metadata (release_info.py)"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from release_info import extract_release_info  # noqa: E402
+
+
+@pytest.mark.parametrize("title, year", [
+    ("Movie.2012.10bit.x265.mkv", 2012),
+    ("Movie.2012.1080p.BluRay.x264", 2012),
+    ("Blade Runner 2049 2017", 2017),
+    ("1984 (1956)", 1956),
+    ("Ubuntu 2019.04 Desktop", None),
+    ("Tool 2020.10.1 Portable", None),
+])
+def test_year(title, year):
+    assert extract_release_info(title).year == year
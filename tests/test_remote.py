@@ -0,0 +1,74 @@
+"""Remote providers against the in-process stub server (remote_stub.py)"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Provider, SearchItem  # noqa: E402
+from remote import HTTPPool, JSONSearchProvider  # noqa: E402
+from remote_stub import running_stub  # noqa: E402
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_connections_are_reused():
+    async def scenario(url):
+        pool = HTTPPool()
+        remote = JSONSearchProvider("stub", url, item_type=SearchItem, pool=pool)
+        try:
+            for _ in range(5):
+                items = await remote.search("tears")
+                assert [item.title for item in items] == ["Tears of Steel 1080p (stub)"]
+        finally:
+            await pool.aclose()
+
+    with running_stub() as server:
+        run(scenario(server.url))
+        assert server.requests == 5
+        assert server.connections == 1
+
+
+def test_503_is_retried():
+    async def scenario(url):
+        pool = HTTPPool(retries=2, backoff=0.01)
+        remote = JSONSearchProvider("stub", url, item_type=SearchItem, pool=pool)
+        try:
+            items = await remote.search("cosmos")
+        finally:
+            await pool.aclose()
+        assert [item.source for item in items] == ["stub"]
+        assert pool.retried == 1
+
+    with running_stub(fail_first=1) as server:
+        run(scenario(server.url))
+        assert server.requests == 2
+
+
+def test_filters_are_applied_after_a_free_text_fetch():
+    async def scenario(url):
+        pool = HTTPPool()
+        remote = JSONSearchProvider("stub", url, item_type=SearchItem, pool=pool)
+        provider = Provider("stub", remote.search, timeout=5.0)
+        try:
+            return (
+                await provider.call("tears seeds>10"),
+                await provider.call("tears res:1080p"),
+                await provider.call("tears seeds>1000"),
+            )
+        finally:
+            await pool.aclose()
+
+    with running_stub() as server:
+        seeded, hd, none = run(scenario(server.url))
+    assert [item.title for item in seeded] == ["Tears of Steel 1080p (stub)"]
+    assert [item.title for item in hd] == ["Tears of Steel 1080p (stub)"]
+    assert none == []
@@ -0,0 +1,35 @@
+"""Typeahead prefix index (text_index.py)"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_index import PrefixIndex  # noqa: E402
+
+WORDS = "the a of star wars ubuntu desktop movie season blade runner".split()
+
+
+def entries(n, seed):
+    rng = random.Random(seed)
+    return [(" ".join(rng.choice(WORDS) for _ in range(3)) + f" {seed}-{i}", rng.randrange(100)) for i in range(n)]
+
+
+def brute_force(pairs, prefix, limit):
+    matches = [
+        (weight, -ref, title) for ref, (title, weight) in enumerate(pairs)
+        if any(key.startswith(prefix) for key in PrefixIndex._keys_of(title))
+    ]
+    return [(title, weight) for weight, _, title in sorted(matches, reverse=True)[:limit]]
+
+
+def test_suggestions_match_a_full_scan():
+    first, more = entries(800, 1), entries(400, 2)
+    built = PrefixIndex(first + more)
+    extended = PrefixIndex(first).extended(more)
+    for prefix in ["t", "th", "the", "ubu", "the s", "star wars", "blade runner m", "zzz"]:
+        expected = brute_force(first + more, prefix, 10)
+        # asked twice: wide ranges are memoized on the first lookup
+        assert built.suggest(prefix) == built.suggest(prefix) == expected
+        assert extended.suggest(prefix) == extended.suggest(prefix) == expected
@@ -0,0 +1,272 @@
+"""
+Text Index
+
+An in-memory inverted index (token -> sorted posting list of document ids) for
+provider catalogs. Built once per catalog; queries are an AND over the query
+tokens, each token matching as a prefix of indexed tokens. Documents and queries
+are tokenized by textnorm, so they share one (memoized) normalization.
+
+Typo tolerance comes from a trigram index over the vocabulary: a misspelled
+query token is expanded to the indexed tokens that share enough trigrams with it,
+so fuzzy matching never scans the catalog itself.
+
+PrefixIndex serves typeahead suggestions weighted by popularity.
+
+Indexes are immutable; extended() returns a new index with documents appended,
+copying only the posting lists and keys the new documents touch, so growing a
+catalog does not re-tokenize what is already indexed.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from textnorm import normalize_text, tokenize
+
+
+def trigrams(token: str) -> set:
+    """Trigrams of `token` padded with boundary markers ("ubuntu" -> {"$ub", "ubu", ..., "tu$"})"""
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram -> term index for finding terms similar to a (possibly misspelled) token"""
+
+    def __init__(self, terms: Iterable[str]):
+        self._terms: List[str] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._add(terms)
+
+    def _add(self, terms: Iterable[str]) -> None:
+        # appended ids go into fresh lists, so lists shared with another index are never mutated
+        added: Dict[str, List[int]] = {}
+        for term in terms:
+            grams = trigrams(term)
+            for gram in grams:
+                added.setdefault(gram, []).append(len(self._terms))
+            self._terms.append(term)
+            self._sizes.append(len(grams))
+        for gram, ids in added.items():
+            self._postings[gram] = self._postings.get(gram, []) + ids
+
+    def extended(self, terms: Iterable[str]) -> "TrigramIndex":
+        """A new index over this one's terms plus `terms`; this index is left untouched"""
+        index = TrigramIndex(())
+        index._terms = list(self._terms)
+        index._sizes = list(self._sizes)
+        index._postings = dict(self._postings)
+        index._add(terms)
+        return index
+
+    def similar(self, token: str, min_similarity: float = 0.3) -> List[Tuple[str, float]]:
+        """Terms with Dice similarity >= `min_similarity` to `token`, best first"""
+        grams = trigrams(token)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for term_id in self._postings.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+        matches = []
+        for term_id, count in shared.items():
+            score = 2.0 * count / (len(grams) + self._sizes[term_id])
+            if score >= min_similarity:
+                matches.append((self._terms[term_id], score))
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+
+class InvertedIndex:
+    """Immutable token -> posting list index over a sequence of documents"""
+
+    def __init__(self, docs: Iterable[str]):
+        postings: Dict[str, List[int]] = {}
+        size = 0
+        for doc_id, doc in enumerate(docs):
+            size += 1
+            for token in set(tokenize(doc)):
+                postings.setdefault(token, []).append(doc_id)
+        self.size = size
+        self._postings = postings
+        # sorted vocabulary for prefix lookups, trigrams of it for fuzzy lookups
+        self._vocabulary = sorted(postings)
+        self._trigrams = TrigramIndex(self._vocabulary)
+
+    def extended(self, docs: Iterable[str]) -> "InvertedIndex":
+        """A new index over this one's documents followed by `docs`; this index is left untouched"""
+        added: Dict[str, List[int]] = {}
+        size = self.size
+        for doc in docs:
+            for token in set(tokenize(doc)):
+                added.setdefault(token, []).append(size)
+            size += 1
+
+        index = InvertedIndex(())
+        index.size = size
+        index._postings = dict(self._postings)
+        for token, ids in added.items():
+            index._postings[token] = self._postings.get(token, []) + ids
+        new_terms = sorted(token for token in added if token not in self._postings)
+        index._vocabulary = list(heapq.merge(self._vocabulary, new_terms))
+        index._trigrams = self._trigrams.extended(new_terms)
+        return index
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _prefix_postings(self, prefix: str) -> set:
+        matched = set()
+        vocab = self._vocabulary
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            matched.update(self._postings[vocab[i]])
+            i += 1
+        return matched
+
+    def search(self, query: str, prefix: bool = True, within: Optional[set] = None) -> List[int]:
+        """
+        Ids of documents containing every query token (as a prefix if `prefix`), in document
+        order. `within` restricts the search to an already filtered set of ids.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return sorted(within) if within is not None else list(range(self.size))
+
+        candidates = within
+        for token in dict.fromkeys(tokens):
+            if prefix:
+                ids = self._prefix_postings(token)
+            else:
+                ids = set(self._postings.get(token, ()))
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        return sorted(candidates)
+
+    def fuzzy_search(self, query: str, min_similarity: float = 0.3,
+                     within: Optional[set] = None) -> List[Tuple[int, float]]:
+        """
+        Typo-tolerant AND search. Each query token matches indexed tokens it prefixes (score 1)
+        or that are trigram-similar to it (score = similarity). Returns (doc id, mean score),
+        best first. `within` restricts the search to an already filtered set of ids.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            ids = sorted(within) if within is not None else range(self.size)
+            return [(doc_id, 1.0) for doc_id in ids]
+
+        totals: Optional[Dict[int, float]] = None
+        if within is not None:
+            totals = dict.fromkeys(within, 0.0)
+        for token in tokens:
+            scores: Dict[int, float] = dict.fromkeys(self._prefix_postings(token), 1.0)
+            # very short tokens have too few trigrams to compare meaningfully
+            if len(token) >= 3:
+                for term, similarity in self._trigrams.similar(token, min_similarity):
+                    for doc_id in self._postings[term]:
+                        if similarity > scores.get(doc_id, 0.0):
+                            scores[doc_id] = similarity
+            if totals is None:
+                totals = scores
+            else:
+                totals = {d: totals[d] + s for d, s in scores.items() if d in totals}
+            if not totals:
+                return []
+
+        ranked = [(doc_id, total / len(tokens)) for doc_id, total in totals.items()]
+        ranked.sort(key=lambda r: (-r[1], r[0]))
+        return ranked
+
+
+class PrefixIndex:
+    """
+    Weighted typeahead index over titles: a sorted array of normalized keys (the whole
+    title and every word-suffix of it, so "bun" finds "Big Buck Bunny") searched with
+    bisect. Top entries for prefixes of up to three characters are precomputed, and those
+    of longer prefixes that still cover a wide key range are memoized on first use, so
+    lookups do not keep scanning large ranges.
+    """
+
+    SHORT_PREFIX = 3
+    # longer prefixes matching more keys than this get their top entries memoized
+    WIDE_RANGE = 256
+    MAX_MEMOIZED = 4096
+
+    def __init__(self, entries: Iterable[Tuple[str, int]], max_results: int = 20):
+        self.max_results = max_results
+        self._titles: List[str] = []
+        self._weights: List[int] = []
+        keyed: List[Tuple[str, int]] = []
+        for title, weight in entries:
+            ref = len(self._titles)
+            self._titles.append(title)
+            self._weights.append(weight or 0)
+            keyed.extend((key, ref) for key in self._keys_of(title))
+        keyed.sort()
+        self._keys = [k for k, _ in keyed]
+        self._refs = [r for _, r in keyed]
+
+        short: Dict[str, set] = {}
+        for key, ref in keyed:
+            for n in range(1, min(self.SHORT_PREFIX, len(key)) + 1):
+                short.setdefault(key[:n], set()).add(ref)
+        self._short = {p: self._best(refs, max_results) for p, refs in short.items()}
+        self._wide: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _keys_of(title: str) -> List[str]:
+        tokens = tokenize(title)
+        return [" ".join(tokens[i:]) for i in range(len(tokens))]
+
+    def extended(self, entries: Iterable[Tuple[str, int]]) -> "PrefixIndex":
+        """A new index with `entries` added; this index is left untouched"""
+        index = PrefixIndex((), self.max_results)
+        index._titles = list(self._titles)
+        index._weights = list(self._weights)
+        index._keys = list(self._keys)
+        index._refs = list(self._refs)
+        index._short = dict(self._short)
+        touched: Dict[str, set] = {}
+        for title, weight in entries:
+            ref = len(index._titles)
+            index._titles.append(title)
+            index._weights.append(weight or 0)
+            for key in self._keys_of(title):
+                # new refs are the largest, so they go after equal keys to keep (key, ref) order
+                i = bisect_right(index._keys, key)
+                index._keys.insert(i, key)
+                index._refs.insert(i, ref)
+                for n in range(1, min(self.SHORT_PREFIX, len(key)) + 1):
+                    touched.setdefault(key[:n], set()).add(ref)
+        # the new top list of a prefix is among its old top list and the new refs
+        for prefix, refs in touched.items():
+            index._short[prefix] = index._best(refs.union(self._short.get(prefix, ())), self.max_results)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def _best(self, refs: Iterable[int], limit: int) -> List[int]:
+        return heapq.nlargest(limit, refs, key=lambda r: (self._weights[r], -r))
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Up to `limit` (title, weight) pairs whose title has a word sequence starting with `prefix`"""
+        prefix = normalize_text(prefix)
+        limit = min(limit, self.max_results)
+        if not prefix:
+            return []
+        if len(prefix) <= self.SHORT_PREFIX:
+            refs = self._short.get(prefix, [])[:limit]
+        elif prefix in self._wide:
+            refs = self._wide[prefix][:limit]
+        else:
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + "\uffff", lo)
+            if hi - lo <= self.WIDE_RANGE:
+                refs = self._best(set(self._refs[lo:hi]), limit)
+            else:
+                if len(self._wide) >= self.MAX_MEMOIZED:
+                    self._wide.clear()
+                best = self._wide[prefix] = self._best(set(self._refs[lo:hi]), self.max_results)
+                refs = best[:limit]
+        return [(self._titles[r], self._weights[r]) for r in refs]
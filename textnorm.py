@@ -0,0 +1,34 @@
+"""
+Text Normalization
+
+One normalization pipeline shared by every search path (token index, typeahead,
+fuzzy matching, ranking, near-duplicate signatures):
+
+    NFKD folding  ->  drop combining marks  ->  casefold  ->  split on separators
+
+so "Ｕｂｕｎｔｕ-22.04.4", "ubuntu 22 04 4" and "Übuntu" all meet in the same
+tokens. Results are memoized per distinct string, so a title is normalized once
+no matter how many indexes and requests look at it.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Tuple
+
+# anything that is not a letter or digit separates tokens: spaces, dots, dashes, underscores, brackets...
+_SEPARATORS_RE = re.compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_text(text: str) -> str:
+    """Folded, casefolded form of `text` with single spaces between tokens"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_SEPARATORS_RE.split(stripped.casefold())).strip()
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Normalized tokens of `text`"""
+    return tuple(normalize_text(text).split())